@@ -1,4 +1,4 @@
-"""create users table
+"""create users table (duplicate of a3cbf5723fdf, no-op)
 
 Revision ID: 10506951739c
 Revises: a3cbf5723fdf
@@ -20,21 +20,12 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.create_table('users',
-    sa.Column('id', sa.UUID(), nullable=False),
-    sa.Column('full_name', sa.String(), nullable=False),
-    sa.Column('email', sa.String(), nullable=True),
-    sa.Column('hashed_password', sa.String(), nullable=True),
-    sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
-    # ### end Alembic commands ###
+    # Autogenerated a second time by mistake: a3cbf5723fdf already creates
+    # users. Kept as a no-op so databases stamped at this revision still
+    # have their place in the history.
+    pass
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_index(op.f('ix_users_email'), table_name='users')
-    op.drop_table('users')
-    # ### end Alembic commands ###
+    pass
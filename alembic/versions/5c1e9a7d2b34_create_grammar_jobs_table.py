@@ -0,0 +1,49 @@
+"""create grammar_jobs table
+
+Revision ID: 5c1e9a7d2b34
+Revises: 48ee314c995c
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d2b34'
+down_revision: Union[str, Sequence[str], None] = '48ee314c995c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'grammar_jobs',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('revision_id', UUID(as_uuid=True), sa.ForeignKey('note_revisions.id', ondelete='CASCADE'),
+                  nullable=False),
+        sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('total_issues', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+
+    op.create_index('ix_grammar_jobs_revision_id', 'grammar_jobs', ['revision_id'])
+    # Only one queued/running job per revision, so duplicate submissions coalesce
+    op.create_index(
+        'ux_grammar_jobs_active_revision',
+        'grammar_jobs',
+        ['revision_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade():
+    op.drop_index('ux_grammar_jobs_active_revision', 'grammar_jobs')
+    op.drop_index('ix_grammar_jobs_revision_id', 'grammar_jobs')
+    op.drop_table('grammar_jobs')
@@ -0,0 +1,41 @@
+"""store grammar issue replacements as jsonb
+
+Revision ID: 8f3a21c6d9e0
+Revises: 5c1e9a7d2b34
+Create Date: 2026-10-19 10:02:17.540912
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a21c6d9e0'
+down_revision: Union[str, Sequence[str], None] = '5c1e9a7d2b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # replacements used to hold a JSON encoded string, convert it in place
+    op.alter_column(
+        'grammar_issues',
+        'replacements',
+        type_=JSONB(),
+        existing_type=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='replacements::jsonb',
+    )
+
+
+def downgrade():
+    op.alter_column(
+        'grammar_issues',
+        'replacements',
+        type_=sa.Text(),
+        existing_type=JSONB(),
+        existing_nullable=True,
+        postgresql_using='replacements::text',
+    )
@@ -0,0 +1,29 @@
+"""note_tags foreign keys with ON DELETE CASCADE
+
+Revision ID: a7e3c9d2f518
+Revises: f4b2d8c1a963
+Create Date: 2026-10-19 18:05:31.774012
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9d2f518'
+down_revision: Union[str, Sequence[str], None] = 'f4b2d8c1a963'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Databases built by create_all got these without the cascade that
+    # 23dc62d18452 declares; recreate them so both end up the same
+    for column, target in (('note_id', 'notes'), ('tag_id', 'tags')):
+        op.execute(f"ALTER TABLE note_tags DROP CONSTRAINT IF EXISTS note_tags_{column}_fkey")
+        op.create_foreign_key(f'note_tags_{column}_fkey', 'note_tags', target, [column], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    # 23dc62d18452 already declared the cascade, so there is nothing to undo
+    pass
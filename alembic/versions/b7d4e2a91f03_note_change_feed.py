@@ -0,0 +1,38 @@
+"""add notes.updated_at and notes.change_seq for the change feed
+
+Revision ID: b7d4e2a91f03
+Revises: 8f3a21c6d9e0
+Create Date: 2026-10-19 13:05:41.218334
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e2a91f03'
+down_revision: Union[str, Sequence[str], None] = '8f3a21c6d9e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence('note_change_seq')))
+    # existing notes get a sequence value each (nextval is evaluated per row)
+    op.add_column(
+        'notes',
+        sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('note_change_seq')"), nullable=False),
+    )
+    op.add_column(
+        'notes',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_notes_owner_id_change_seq', 'notes', ['owner_id', 'change_seq'])
+
+
+def downgrade():
+    op.drop_index('ix_notes_owner_id_change_seq', table_name='notes')
+    op.drop_column('notes', 'updated_at')
+    op.drop_column('notes', 'change_seq')
+    op.execute(sa.schema.DropSequence(sa.Sequence('note_change_seq')))
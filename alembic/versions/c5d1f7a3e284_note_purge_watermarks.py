@@ -0,0 +1,30 @@
+"""note_purge_watermarks: what the trash purge removed from the change feed
+
+Revision ID: c5d1f7a3e284
+Revises: a7e3c9d2f518
+Create Date: 2026-10-19 18:31:09.204417
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d1f7a3e284'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c9d2f518'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'note_purge_watermarks',
+        sa.Column('owner_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('purged_through', sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('note_purge_watermarks')
@@ -0,0 +1,70 @@
+"""store note and revision bodies as bytea with a compression header
+
+Revision ID: d2c8f4b6a715
+Revises: b7d4e2a91f03
+Create Date: 2026-10-19 14:21:09.663102
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2c8f4b6a715'
+down_revision: Union[str, Sequence[str], None] = 'b7d4e2a91f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (('notes', True), ('note_revisions', False))  # (table, content nullable)
+BATCH_SIZE = 500
+
+
+def upgrade():
+    # existing bodies become raw values (header byte 0); compress them afterwards,
+    # in batches and online, with: python -m scripts.compress_content
+    for table, nullable in TABLES:
+        op.alter_column(
+            table,
+            'content',
+            type_=sa.LargeBinary(),
+            existing_type=sa.String(),
+            existing_nullable=nullable,
+            postgresql_using="'\\x00'::bytea || convert_to(content, 'UTF8')",
+        )
+
+
+def downgrade():
+    from app.core.compression import RAW, text_codec
+
+    conn = op.get_bind()
+    for table, nullable in TABLES:
+        # SQL can only unwrap raw values; decompress the rest here first, in batches
+        rows_table = sa.table(table, sa.column('id'), sa.column('content', sa.LargeBinary()))
+        last_id = None
+        while True:
+            query = (
+                sa.select(rows_table.c.id, rows_table.c.content)
+                .where(sa.func.get_byte(rows_table.c.content, 0) != RAW)
+                .order_by(rows_table.c.id)
+                .limit(BATCH_SIZE)
+            )
+            if last_id is not None:
+                query = query.where(rows_table.c.id > last_id)
+            rows = conn.execute(query).all()
+            if not rows:
+                break
+            conn.execute(
+                rows_table.update().where(rows_table.c.id == sa.bindparam('row_id')).values(content=sa.bindparam('raw')),
+                [{'row_id': row_id, 'raw': bytes((RAW,)) + text_codec.decode(value).encode('utf-8')} for row_id, value in rows],
+            )
+            last_id = rows[-1][0]
+
+        op.alter_column(
+            table,
+            'content',
+            type_=sa.String(),
+            existing_type=sa.LargeBinary(),
+            existing_nullable=nullable,
+            postgresql_using="convert_from(substring(content from 2), 'UTF8')",
+        )
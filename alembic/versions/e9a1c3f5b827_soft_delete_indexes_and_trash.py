@@ -0,0 +1,43 @@
+"""partial indexes for live and deleted notes, notes.deleted_at for the trash
+
+Revision ID: e9a1c3f5b827
+Revises: d2c8f4b6a715
+Create Date: 2026-10-19 15:12:44.081927
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a1c3f5b827'
+down_revision: Union[str, Sequence[str], None] = 'd2c8f4b6a715'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('notes', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # notes already in the trash get a full retention period from now
+    op.execute("UPDATE notes SET deleted_at = now() WHERE is_deleted")
+    op.execute("UPDATE notes SET is_deleted = false WHERE is_deleted IS NULL")
+    op.alter_column('notes', 'is_deleted', existing_type=sa.Boolean(), nullable=False, server_default=sa.false())
+
+    op.create_index('ix_notes_owner_id_live', 'notes', ['owner_id'], postgresql_where=sa.text('is_deleted = false'))
+    op.create_index('ix_notes_owner_id_trash', 'notes', ['owner_id', 'deleted_at'],
+                    postgresql_where=sa.text('is_deleted = true'))
+    op.create_index('ix_notes_trash_deleted_at', 'notes', ['deleted_at'], postgresql_where=sa.text('is_deleted = true'))
+    # foreign keys that the owner scans and the purge follow
+    op.create_index('ix_note_revisions_note_id', 'note_revisions', ['note_id'])
+    op.create_index('ix_note_tags_tag_id', 'note_tags', ['tag_id'])
+
+
+def downgrade():
+    op.drop_index('ix_note_tags_tag_id', table_name='note_tags')
+    op.drop_index('ix_note_revisions_note_id', table_name='note_revisions')
+    op.drop_index('ix_notes_trash_deleted_at', table_name='notes')
+    op.drop_index('ix_notes_owner_id_trash', table_name='notes')
+    op.drop_index('ix_notes_owner_id_live', table_name='notes')
+    op.alter_column('notes', 'is_deleted', existing_type=sa.Boolean(), nullable=True, server_default=None)
+    op.drop_column('notes', 'deleted_at')
@@ -0,0 +1,50 @@
+"""create grammar_batches table
+
+Revision ID: f4b2d8c1a963
+Revises: e9a1c3f5b827
+Create Date: 2026-10-19 17:40:12.562310
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b2d8c1a963'
+down_revision: Union[str, Sequence[str], None] = 'e9a1c3f5b827'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'grammar_batches',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('owner_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('note_ids', JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column('tag', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('report', JSONB(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+
+    op.create_index('ix_grammar_batches_owner_id', 'grammar_batches', ['owner_id'])
+    # Only one queued/running batch per user, so resubmissions coalesce
+    op.create_index(
+        'ux_grammar_batches_active_owner',
+        'grammar_batches',
+        ['owner_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade():
+    op.drop_index('ux_grammar_batches_active_owner', 'grammar_batches')
+    op.drop_index('ix_grammar_batches_owner_id', 'grammar_batches')
+    op.drop_table('grammar_batches')
@@ -1,33 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-import json
 
-from app.core.database import get_db
-from app.services.authorization_service import get_current_user
+from app.core.database import get_db, get_read_db
+from app.services.authorization_service import get_current_user, get_current_reader
 from app.services.grammar_service import GrammarService
+from app.services.grammar_checker import get_checker
+from app.services.grammar_jobs import grammar_jobs, GrammarQueueFull
+from app.services.grammar_batch import grammar_batches
 from app.schemas.grammar import (
     GrammarCheckResponse,
-    GrammarIssueOut,
+    GrammarJobOut,
+    GrammarBatchRequest,
+    GrammarBatchOut,
     ApplyFixesRequest,
     ApplyFixesResponse
 )
 from app.models.user import User
-from app.models.note import Note
+from app.models.note import Note, owner_lock
 from app.models.note_revision import NoteRevision
+from app.models.grammar_job import GrammarJob
+from app.models.grammar_batch import GrammarBatch
+from app.schemas.note import NoteUpdate
+from app.api.notes import update_note_with_revision
 from sqlalchemy.future import select
 
 router = APIRouter(prefix="/notes", tags=["Grammar Checking"])
 
 
-@router.post("/{note_id}/revisions/{revision_id}/grammar-check", response_model=GrammarCheckResponse)
+@router.post("/grammar-check/batch", response_model=GrammarBatchOut, status_code=202)
+async def check_grammar_batch(
+        request: GrammarBatchRequest,
+        response: Response,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a grammar check of the latest revision of many notes.
+
+    Selects the current user's notes by id and/or tag (all notes when both
+    are empty). Returns 202 with the batch; poll the batch endpoint for its
+    report, which also lists the selected notes that were skipped.
+    Submitting again while the user's batch is queued or running returns
+    that batch instead of a new one.
+    """
+    checker = await get_checker()
+    if not checker.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Grammar backend is temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(checker.retry_after())))}
+        )
+
+    try:
+        batch = await grammar_batches.submit(db, current_user.id, request.note_ids, request.tag)
+    except GrammarQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    response.headers["Location"] = f"/notes/grammar-check/batch/{batch.id}"
+    return batch
+
+
+@router.get("/grammar-check/batch/{batch_id}", response_model=GrammarBatchOut)
+async def get_grammar_batch(
+        batch_id: UUID,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(
+        select(GrammarBatch).where(
+            GrammarBatch.id == batch_id,
+            GrammarBatch.owner_id == current_user.id
+        )
+    )
+    batch = result.scalar_one_or_none()
+
+    if not batch:
+        raise HTTPException(
+            status_code=404,
+            detail="Grammar batch not found"
+        )
+
+    return batch
+
+
+@router.post(
+    "/{note_id}/revisions/{revision_id}/grammar-check",
+    response_model=GrammarJobOut,
+    status_code=202
+)
 async def check_grammar(
         note_id: UUID,
         revision_id: UUID,
+        response: Response,
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
+    """
+    Queue a grammar check for a revision.
 
+    Returns 202 with the job; poll the job endpoint, then read the results
+    from grammar-issues. Submitting again while a check for the same
+    revision is queued or running returns that job instead of a new one.
+    """
     # Verify user owns the note
     result = await db.execute(
         select(Note)
@@ -46,50 +122,61 @@ async def check_grammar(
             detail="Note or revision not found"
         )
 
-    # Run grammar check
-    try:
-        issues = await GrammarService.check_revision(db, revision_id)
-    except Exception as e:
+    # Fail fast while the grammar backend is known to be down
+    checker = await get_checker()
+    if not checker.is_available():
         raise HTTPException(
-            status_code=500,
-            detail=f"Grammar check failed: {str(e)}"
+            status_code=503,
+            detail="Grammar backend is temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(checker.retry_after())))}
         )
 
-    # Convert to response format
-    issues_out = []
-    for issue in issues:
-        replacements = json.loads(issue.replacements) if issue.replacements else []
-        issues_out.append(
-            GrammarIssueOut(
-                id=issue.id,
-                revision_id=issue.revision_id,
-                message=issue.message,
-                short_message=issue.short_message,
-                offset=issue.offset,
-                length=issue.length,
-                context=issue.context,
-                replacements=replacements,
-                issue_type=issue.issue_type,
-                rule_id=issue.rule_id,
-                category=issue.category,
-                is_applied=issue.is_applied,
-                created_at=issue.created_at
-            )
-        )
+    try:
+        job = await grammar_jobs.submit(db, revision_id)
+    except GrammarQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    return GrammarCheckResponse(
-        revision_id=revision_id,
-        total_issues=len(issues_out),
-        issues=issues_out
+    response.headers["Location"] = f"/notes/{note_id}/revisions/{revision_id}/grammar-jobs/{job.id}"
+    return job
+
+
+@router.get("/{note_id}/revisions/{revision_id}/grammar-jobs/{job_id}", response_model=GrammarJobOut)
+async def get_grammar_job(
+        note_id: UUID,
+        revision_id: UUID,
+        job_id: UUID,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    # Verify user owns the note the job belongs to
+    result = await db.execute(
+        select(GrammarJob)
+        .join(NoteRevision, GrammarJob.revision_id == NoteRevision.id)
+        .join(Note, NoteRevision.note_id == Note.id)
+        .where(
+            GrammarJob.id == job_id,
+            NoteRevision.id == revision_id,
+            Note.id == note_id,
+            Note.owner_id == current_user.id
+        )
     )
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Grammar job not found"
+        )
+
+    return job
 
 
 @router.get("/{note_id}/revisions/{revision_id}/grammar-issues", response_model=GrammarCheckResponse)
 async def get_grammar_issues(
         note_id: UUID,
         revision_id: UUID,
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_read_db),
+        current_user: User = Depends(get_current_reader)
 ):
 
     # Verify user owns the note
@@ -110,36 +197,15 @@ async def get_grammar_issues(
             detail="Note or revision not found"
         )
 
-    # Get stored issues
-    issues = await GrammarService.get_issues(db, revision_id)
-
-    # Convert to response format
-    issues_out = []
-    for issue in issues:
-        replacements = json.loads(issue.replacements) if issue.replacements else []
-        issues_out.append(
-            GrammarIssueOut(
-                id=issue.id,
-                revision_id=issue.revision_id,
-                message=issue.message,
-                short_message=issue.short_message,
-                offset=issue.offset,
-                length=issue.length,
-                context=issue.context,
-                replacements=replacements,
-                issue_type=issue.issue_type,
-                rule_id=issue.rule_id,
-                category=issue.category,
-                is_applied=issue.is_applied,
-                created_at=issue.created_at
-            )
-        )
+    # Rows are already in GrammarCheckResponse's shape, so skip per-issue
+    # model validation and serialize them directly
+    issues = await GrammarService.get_issue_rows(db, revision_id)
 
-    return GrammarCheckResponse(
-        revision_id=revision_id,
-        total_issues=len(issues_out),
-        issues=issues_out
-    )
+    return ORJSONResponse({
+        "revision_id": revision_id,
+        "total_issues": len(issues),
+        "issues": issues,
+    })
 
 
 @router.post("/{note_id}/revisions/{revision_id}/apply-fixes", response_model=ApplyFixesResponse)
@@ -151,9 +217,14 @@ async def apply_grammar_fixes(
         current_user: User = Depends(get_current_user)
 ):
 
+    if request.save_as_version:
+        # Hold the owner's change lock from before reading the note, so no
+        # other write can land between reading its text and the save
+        await db.execute(owner_lock(current_user.id))
+
     # Verify user owns the note
     result = await db.execute(
-        select(Note)
+        select(Note, NoteRevision)
         .join(NoteRevision)
         .where(
             Note.id == note_id,
@@ -161,20 +232,26 @@ async def apply_grammar_fixes(
             NoteRevision.id == revision_id
         )
     )
-    note = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not note:
+    if not row:
         raise HTTPException(
             status_code=404,
             detail="Note or revision not found"
         )
 
+    note, revision = row
+
     # Apply fixes
     try:
-        corrected_content = await GrammarService.apply_fixes(
+        fixes = await GrammarService.apply_fixes(
             db,
             revision_id,
-            request.issue_ids
+            request.issue_ids,
+            commit=not request.save_as_version,
+            # Issue offsets refer to the revision's text; move the fixes onto
+            # the note's current text, so saving keeps everything it gained since
+            onto=(note.title, note.content or "") if request.save_as_version else None
         )
     except Exception as e:
         raise HTTPException(
@@ -182,8 +259,30 @@ async def apply_grammar_fixes(
             detail=f"Failed to apply fixes: {str(e)}"
         )
 
+    applied_count = len(fixes.applied_ids)
+    if request.save_as_version:
+        # Same transaction: the issues are marked applied only if the note is saved
+        saved_note = await update_note_with_revision(
+            db,
+            note_id,
+            current_user.id,
+            NoteUpdate(title=fixes.title, content=fixes.content)
+        )
+        if not saved_note:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Note not found")
+        message = f"Applied {applied_count} grammar fixes and saved them as a new note version."
+    else:
+        message = f"Applied {applied_count} grammar fixes. Use the update endpoint to save changes."
+
+    if fixes.conflicting_ids:
+        message += f" Skipped {len(fixes.conflicting_ids)} overlapping or outdated fixes."
+
     return ApplyFixesResponse(
-        applied_count=len(request.issue_ids),
-        new_content=corrected_content,
-        message=f"Applied {len(request.issue_ids)} grammar fixes. Use the update endpoint to save changes."
+        applied_count=applied_count,
+        new_content=fixes.text,
+        message=message,
+        applied_issue_ids=fixes.applied_ids,
+        conflicting_issue_ids=fixes.conflicting_ids,
+        saved=request.save_as_version
     )
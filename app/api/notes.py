@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+from typing import Optional
 from uuid import UUID
 
-from app.models.note import Note
-from app.services.note_service import create_note, get_notes, get_note_by_id, update_note, soft_delete_note
-from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
-from app.services.authorization_service import get_current_user
-from app.core.database import get_db
+from app.models.note import Note, owner_lock
+from app.services.note_service import create_note, get_note_changes, get_note_rows, resolve_tags, restore_note, update_note, soft_delete_note
+from app.schemas.note import BulkNoteRequest, BulkNoteResponse, NoteChanges, NoteCreate, NotePatch, NotePatchResult, NoteUpdate, NoteResponse
+from app.services.note_bulk import bulk_write
+from app.services.note_cache import note_response_cache
+from app.services.note_events import after_note_write
+from app.services.note_stream import note_event_stream
+from app.services.text_edits import TextEdit, apply_edits
+from app.services.authorization_service import get_current_user, get_current_reader
+from app.core.database import get_db, get_read_db
+from app.core.fast_json import FastJSONResponse, dumps
+from app.core.query_budget import query_budget
 from app.models.user import User
 from app.models.note_revision import NoteRevision
 from app.models.tags import Tag
@@ -54,18 +64,11 @@ async def update_note_with_revision(
         note.content = note_data.content
 
     if note_data.tags:
-        tags_list = []
-        for tag_name in note_data.tags:
-            tag_result = await db.execute(select(Tag).where(Tag.name == tag_name))
-            tag = tag_result.scalar_one_or_none()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-                await db.flush()  # Flush to get the tag ID
-            tags_list.append(tag)
-        note.tags = tags_list
+        tags = await resolve_tags(db, note_data.tags)
+        note.tags = [tags[tag_name] for tag_name in dict.fromkeys(note_data.tags)]
 
     await db.commit()
+    await after_note_write(note.id, user_id, note.change_seq, "updated")
 
     await db.refresh(note, attribute_names=["tags"])
 
@@ -76,19 +79,84 @@ async def update_note_with_revision(
 async def create_new_note(note: NoteCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     return await create_note(db, note, current_user.id)
 
+@router.post("/bulk", response_model=BulkNoteResponse)
+async def bulk_notes(
+    request: BulkNoteRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create, update and delete many notes in one request; one result per operation, in order.
+
+    Operations are applied in batches, each batch in its own transaction.
+    With atomic=true nothing is applied unless every operation succeeds
+    (409, failed operations carry their error, the rest 424).
+    """
+    results, applied = await bulk_write(db, current_user.id, request.operations, request.atomic)
+    body = {"results": [result.model_dump() for result in results]}
+    return FastJSONResponse(body, status_code=200 if applied or not request.atomic else 409)
+
 @router.get("/", response_model=list[NoteResponse])
+@query_budget(max_queries=3)  # user, notes, tags; none on a cache hit
 async def list_notes(
+    current_user: User = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Serialized straight from column rows; same JSON as list[NoteResponse]
+    async def load():
+        return dumps(await get_note_rows(db, current_user.id))
+
+    body = await note_response_cache.get_or_load(current_user.id, "list", load)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/changes", response_model=NoteChanges)
+@query_budget(max_queries=4)  # user, notes, purge watermark, tags
+async def get_changes(
+    since: int = Query(0, ge=0, description="cursor from the previous call, 0 for everything"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: User = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Notes created, updated or deleted since the cursor, for incremental sync"""
+    return FastJSONResponse(await get_note_changes(db, current_user.id, since, limit))
+
+@router.get("/events")
+async def note_events(
+    last_event_id: Optional[int] = Header(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    return await get_notes(db, current_user.id)
+    """Server-sent events for the user's note changes: {"id", "change_seq", "kind"} per change.
+
+    Reconnects resume after Last-Event-ID (the change_seq of the last event).
+    The replay reads the primary: a lagging replica would miss changes
+    whose live events were already dropped.
+    """
+    return StreamingResponse(
+        note_event_stream(db, current_user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/trash", response_model=list[NoteResponse])
+@query_budget(max_queries=3)  # user, notes, tags
+async def list_trash(
+    current_user: User = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Deleted notes that haven't been purged yet, most recently deleted first"""
+    return FastJSONResponse(await get_note_rows(db, current_user.id, deleted=True))
 
 @router.get("/{note_id}", response_model=NoteResponse)
-async def get_single_note(note_id: UUID, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    note = await get_note_by_id(db, note_id, current_user.id)
-    if not note:
+@query_budget(max_queries=3)  # user, note, tags; none on a cache hit
+async def get_single_note(note_id: UUID, current_user: User = Depends(get_current_reader), db: AsyncSession = Depends(get_read_db)):
+    async def load():
+        rows = await get_note_rows(db, current_user.id, note_id=note_id)
+        return dumps(rows[0]) if rows else None
+
+    body = await note_response_cache.get_or_load(current_user.id, f"note:{note_id}", load)
+    if body is None:
         raise HTTPException(status_code=404, detail="Note not found")
-    return note
+    return Response(content=body, media_type="application/json")
 
 @router.put("/{note_id}", response_model=NoteResponse)
 async def update_existing_note(
@@ -102,6 +170,51 @@ async def update_existing_note(
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
+@router.patch("/{note_id}", response_model=NotePatchResult)
+async def patch_note(
+    note_id: UUID,
+    patch: NotePatch,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply text edits to the content (and optionally set the title), creating a revision like PUT.
+
+    The edits must be made against base_version (the note's change_seq);
+    if the note changed since, nothing is applied and 409 is returned.
+    """
+    # Writers of this owner's notes wait for each other, so the version check holds until commit
+    await db.execute(owner_lock(current_user.id))
+    result = await db.execute(
+        select(Note).where(Note.id == note_id, Note.owner_id == current_user.id, Note.is_deleted == False)
+    )
+    note = result.scalar_one_or_none()
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    if note.change_seq != patch.base_version:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Note changed since base_version", "change_seq": note.change_seq}
+        )
+
+    edits = [TextEdit(op.offset, op.delete, op.insert, key=index) for index, op in enumerate(patch.edits)]
+    content, applied, conflicts = apply_edits(note.content or "", edits)
+    if conflicts:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Edits overlap or fall outside the content", "edits": sorted(e.key for e in conflicts)}
+        )
+
+    note = await update_note_with_revision(
+        db, note_id, current_user.id, NoteUpdate(title=patch.title, content=content, tags=[])
+    )
+    return NotePatchResult(
+        id=note.id,
+        change_seq=note.change_seq,
+        updated_at=note.updated_at,
+        content_length=len(content),
+        content_sha256=hashlib.sha256(content.encode("utf-8")).hexdigest()
+    )
+
 @router.delete("/{note_id}", response_model=NoteResponse)
 async def delete_note(note_id: UUID, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     note = await soft_delete_note(db, note_id, current_user.id)
@@ -109,11 +222,18 @@ async def delete_note(note_id: UUID, current_user: User = Depends(get_current_us
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
+@router.post("/{note_id}/restore", response_model=NoteResponse)
+async def restore_deleted_note(note_id: UUID, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    note = await restore_note(db, note_id, current_user.id)
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found in trash")
+    return note
+
 @router.get("/{note_id}/revisions", response_model=list[RevisionOut])
 async def get_revisions(
     note_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader)
 ):
     result = await db.execute(
         select(NoteRevision)
@@ -150,23 +270,21 @@ async def restore_revision(
     note.content = revision.content
 
     await db.commit()
+    await after_note_write(note.id, current_user.id, note.change_seq, "updated")
 
     return {"message": "Revision restored successfully"}
 
 
 @router.get("/tags/{tag_name}", response_model=list[NoteResponse])
+@query_budget(max_queries=4)  # user, tag, notes, tags
 async def get_notes_by_tag(
         tag_name: str,
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_read_db),
+        current_user: User = Depends(get_current_reader)
 ):
     tag_result = await db.execute(select(Tag).where(Tag.name == tag_name))
     tag = tag_result.scalar_one_or_none()
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
 
-    # Reuse working function and filter in Python
-    all_notes = await get_notes(db, current_user.id)
-    filtered_notes = [note for note in all_notes if any(t.name == tag_name for t in note.tags)]
-
-    return filtered_notes
+    return FastJSONResponse(await get_note_rows(db, current_user.id, tag_id=tag.id))
@@ -3,8 +3,8 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.core.database import get_db
-from app.services.authorization_service import get_current_user
+from app.core.database import get_read_db
+from app.services.authorization_service import get_current_reader
 from app.services.markdown_service import MarkdownService
 from app.models.user import User
 from app.models.note import Note
@@ -58,8 +58,8 @@ async def render_note(
         note_id: UUID,
         request: Request,
         response: Response,
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_read_db),
+        current_user: User = Depends(get_current_reader)
 ):
     """
     Render a note's Markdown content as HTML or JSON.
@@ -81,7 +81,7 @@ async def render_note(
     markdown_content = f"# {note.title}\n\n{note.content or ''}"
 
     # Render to HTML and generate ETag
-    html_content, etag = MarkdownService.render_with_etag(markdown_content)
+    html_content, etag = await MarkdownService.render_note(note.id, markdown_content)
 
     # Check If-None-Match header for caching
     if_none_match = request.headers.get("If-None-Match")
@@ -181,8 +181,8 @@ async def render_note_raw(
         note_id: UUID,
         request: Request,
         response: Response,
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_read_db),
+        current_user: User = Depends(get_current_reader)
 ):
     """
     Get raw sanitized HTML without wrapper (useful for embedding).
@@ -206,7 +206,7 @@ async def render_note_raw(
     markdown_content = f"# {note.title}\n\n{note.content or ''}"
 
     # Render to HTML and generate ETag
-    html_content, etag = MarkdownService.render_with_etag(markdown_content)
+    html_content, etag = await MarkdownService.render_note(note.id, markdown_content)
 
     # Check If-None-Match header for caching
     if_none_match = request.headers.get("If-None-Match")
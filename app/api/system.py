@@ -0,0 +1,117 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import FileResponse
+
+from app.core.cache import get_cache_backend
+from app.core.config import settings
+from app.core.database import engine, replica_engine, pool_stats
+from app.core.profiling import profile_store, valid_profiling_token
+from app.core.query_budget import query_report
+from app.core.readiness import readiness
+from app.services.authorization_service import user_cache
+from app.services.grammar_cache import grammar_cache
+from app.services.grammar_checker import get_checker
+from app.services.markdown_service import render_cache
+from app.services.note_cache import note_response_cache
+from app.services.note_stream import note_broker
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+
+def require_system_token(x_system_token: Optional[str] = Header(None)):
+    """Diagnostics show SQL, cache and backend internals; only for callers holding SYSTEM_TOKEN"""
+    token = settings.SYSTEM_TOKEN
+    if not token:
+        raise HTTPException(status_code=404, detail="Diagnostics are disabled")
+    if x_system_token is None or not hmac.compare_digest(x_system_token.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="X-System-Token required")
+
+
+@router.get("/grammar-cache", dependencies=[Depends(require_system_token)])
+async def grammar_cache_stats():
+    """Paragraph-level grammar result cache: hit rate of this worker"""
+    return grammar_cache.stats()
+
+
+@router.get("/cache", dependencies=[Depends(require_system_token)])
+async def cache_stats():
+    """Shared cache backend and the hit rate of each namespace in this worker"""
+    return {
+        "backend": get_cache_backend().snapshot(),
+        "namespaces": [cache.stats() for cache in (render_cache, user_cache, grammar_cache.cache, note_response_cache.cache)],
+    }
+
+
+@router.get("/note-events", dependencies=[Depends(require_system_token)])
+async def note_event_stats():
+    """Open note event streams in this worker, events published and slow streams dropped"""
+    return note_broker.stats()
+
+
+@router.get("/grammar-backend", dependencies=[Depends(require_system_token)])
+async def grammar_backend_status():
+    """Grammar backend health: circuit breaker state, latency histogram, retry counters"""
+    checker = await get_checker()
+    return checker.snapshot()
+
+
+@router.get("/db-pool", dependencies=[Depends(require_system_token)])
+async def db_pool_stats():
+    """Connection pool usage: checked-out connections, overflow and checkout wait time"""
+    return {
+        "primary": pool_stats(engine),
+        "replica": pool_stats(replica_engine) if replica_engine is not None else None,
+    }
+
+
+@router.get("/query-report", dependencies=[Depends(require_system_token)])
+async def query_budget_report(limit: int = 10):
+    """Routes with the most SQL statements and budget violations (needs QUERY_BUDGET_ENABLED)"""
+    return {
+        "enabled": settings.QUERY_BUDGET_ENABLED,
+        "worst_routes": query_report.worst(limit),
+        "recent_violations": query_report.violations[-limit:],
+    }
+
+
+def require_profiling_token(x_profile: Optional[str] = Header(None)):
+    """Profiles show code paths and SQL; only for callers holding PROFILING_TOKEN"""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not valid_profiling_token(x_profile):
+        raise HTTPException(status_code=403, detail="X-Profile token required")
+
+
+@router.get("/profiles", dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """Saved request profiles of this host, newest first"""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def get_profile(profile_id: str):
+    """Spans (render, grammar, SQL), totals per span and the top functions of one profiled request"""
+    report = profile_store.load(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+
+@router.get("/profiles/{profile_id}/download", dependencies=[Depends(require_profiling_token)])
+async def download_profile(profile_id: str):
+    """The cProfile stats file, for python -m pstats or snakeviz"""
+    path = profile_store.path(profile_id, "prof")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
+@router.get("/ready")
+async def ready(response: Response):
+    """Readiness probe: 503 until the background warm-up has finished"""
+    status = readiness.snapshot()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
@@ -0,0 +1,351 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+KEY_PREFIX = "mdn"
+
+
+class CacheBackend:
+    """Byte-value key/value store shared by the caches of this app.
+
+    Keys are full keys (mdn:{namespace}:...), values are bytes, ttl is in
+    seconds (None = no expiry). Backends: memory (per process), file
+    (SQLite file shared by the workers of one host) and redis (shared
+    by every host).
+    """
+
+    name = "base"
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        raise NotImplementedError
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Atomically add one to an integer value (missing counts as 0)"""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    def snapshot(self) -> dict:
+        return {"backend": self.name}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU with per-entry expiry"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._get(key) for key in keys]
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        for key, value in items.items():
+            self._set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        value = int(self._get(key) or 0) + 1
+        self._set(key, str(value).encode(), ttl)
+        return value
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def evict_expired(self) -> int:
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items()
+                   if expires_at is not None and expires_at < now]
+        for key in expired:
+            del self._entries[key]
+        self.evictions += len(expired)
+        return len(expired)
+
+    def snapshot(self) -> dict:
+        self.evict_expired()
+        return {
+            "backend": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+        }
+
+
+class FileCacheBackend(CacheBackend):
+    """SQLite file (WAL mode) shared by all worker processes on a host.
+
+    Calls run in a worker thread so the event loop never waits on disk.
+    Expired rows are skipped on read and purged every few hundred writes.
+    """
+
+    name = "file"
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._writes = 0
+
+    def _run(self, sql: str, params: Iterable = (), many: bool = False):
+        with self._lock:
+            if many:
+                return self._conn.executemany(sql, params).fetchall()
+            return self._conn.execute(sql, params).fetchall()
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        rows = await asyncio.to_thread(
+            self._run,
+            f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(keys))}) "
+            f"AND (expires_at IS NULL OR expires_at > ?)",
+            (*keys, time.time())
+        )
+        # counters written by incr come back as integers
+        found = {key: value if isinstance(value, bytes) else str(value).encode() for key, value in rows}
+        return [found.get(key) for key in keys]
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        await asyncio.to_thread(
+            self._run,
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            [(key, value, expires_at) for key, value in items.items()],
+            True
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            await asyncio.to_thread(self._run, "DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await asyncio.to_thread(
+                self._run, f"DELETE FROM cache WHERE key IN ({','.join('?' * len(keys))})", keys
+            )
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._run,
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "value = CASE WHEN expires_at IS NULL OR expires_at > ? THEN CAST(value AS INTEGER) + 1 ELSE 1 END, "
+            "expires_at = excluded.expires_at "
+            "RETURNING value",
+            (key, now + ttl if ttl else None, now)
+        )
+        return int(rows[0][0])
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._run, "DELETE FROM cache")
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def snapshot(self) -> dict:
+        rows = self._run("SELECT count(*) FROM cache")
+        return {"backend": self.name, "path": self.path, "entries": rows[0][0]}
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis (or any RESP server) through redis-py's asyncio client.
+
+    Pass client= to use something else with the same interface, e.g.
+    fakeredis.aioredis.FakeRedis() in tests.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)") from e
+            client = redis.from_url(url)
+        self.client = client
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, px=int(ttl * 1000) if ttl else None)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            if ttl:
+                pipe.pexpire(key, int(ttl * 1000))
+            results = await pipe.execute()
+        return int(results[0])
+
+    async def clear(self) -> None:
+        # only our keys, the server may be shared
+        keys = [key async for key in self.client.scan_iter(match=f"{KEY_PREFIX}:*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """The process-wide backend, created from CACHE_BACKEND / CACHE_URL on first use"""
+    global _backend
+    if _backend is None:
+        if settings.CACHE_BACKEND == "memory":
+            _backend = MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+        elif settings.CACHE_BACKEND == "file":
+            _backend = FileCacheBackend(settings.CACHE_URL or "mdn-cache.sqlite3")
+        elif settings.CACHE_BACKEND == "redis":
+            _backend = RedisCacheBackend(settings.CACHE_URL or "redis://localhost:6379/0")
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Swap the backend (tests, scripts)"""
+    global _backend
+    _backend = backend
+
+
+async def close_cache_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
+
+class Cache:
+    """One namespace of the shared cache: keys mdn:{namespace}:{key}, fixed TTL.
+
+    Lookups and stores are best effort: if the backend fails they count
+    as a miss / are skipped, so an unreachable cache only makes requests
+    slower. Invalidation (delete, incr) raises, since ignoring it could
+    serve stale data. Counts hits and misses of this process for /metrics.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: Optional[float]):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def key(self, key: str) -> str:
+        return f"{KEY_PREFIX}:{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        try:
+            values = await get_cache_backend().get_many([self.key(key) for key in keys])
+        except Exception as e:
+            self._failed(e)
+            values = [None] * len(keys)
+        found = sum(1 for value in values if value is not None)
+        self.hits += found
+        self.misses += len(values) - found
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self.set_many({key: value}, ttl)
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        try:
+            await get_cache_backend().set_many(
+                {self.key(key): value for key, value in items.items()},
+                ttl if ttl is not None else self.ttl_seconds
+            )
+        except Exception as e:
+            self._failed(e)
+
+    def _failed(self, error: Exception) -> None:
+        if self.errors == 0:
+            print(f"⚠️ Cache {self.namespace} unavailable: {type(error).__name__}: {error}")
+        self.errors += 1
+
+    async def delete(self, *keys: str) -> None:
+        await get_cache_backend().delete(*(self.key(key) for key in keys))
+
+    async def incr(self, key: str) -> int:
+        return await get_cache_backend().incr(self.key(key), self.ttl_seconds)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,108 @@
+import zlib
+from typing import Optional
+
+from app.core.config import settings
+
+# First byte of every stored value
+RAW = 0x00
+ZLIB = 0x01
+ZSTD = 0x02
+ZSTD_DICT = 0x03  # followed by the 4-byte dictionary id
+
+
+class TextCodec:
+    """Text <-> bytes with a one-byte format header, compressing where it pays off.
+
+    Values shorter than min_bytes stay raw unless a zstd dictionary is
+    loaded; dictionaries are what make small notes compress at all, since
+    they share their boilerplate. A compressed value is only kept if it
+    is smaller than the raw one. Decoding handles every format whatever
+    the current settings are, so changing codec needs no migration.
+    """
+
+    def __init__(self, codec: str, min_bytes: int, level: Optional[int] = None, dictionary_path: Optional[str] = None):
+        if codec not in ("off", "zlib", "zstd"):
+            raise ValueError(f"Unknown CONTENT_COMPRESSION: {codec}")
+        self.codec = codec
+        self.min_bytes = min_bytes
+        self.level = level if level is not None else (3 if codec == "zstd" else 6)
+        self.dictionary_path = dictionary_path
+        self._dictionary = None
+        self._compressor = None
+        self._decompressors = {}
+        self._dictionary_loaded = False
+
+    @staticmethod
+    def _zstd():
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("zstd compressed content needs the zstandard package (pip install zstandard)") from e
+        return zstandard
+
+    def _load_dictionary(self):
+        if not self._dictionary_loaded:
+            if self.dictionary_path:
+                zstandard = self._zstd()
+                with open(self.dictionary_path, "rb") as f:
+                    self._dictionary = zstandard.ZstdCompressionDict(f.read())
+            self._dictionary_loaded = True
+        return self._dictionary
+
+    def _zstd_compressor(self):
+        if self._compressor is None:
+            self._compressor = self._zstd().ZstdCompressor(level=self.level, dict_data=self._load_dictionary())
+        return self._compressor
+
+    def _zstd_decompressor(self, dictionary=None):
+        key = dictionary.dict_id() if dictionary is not None else None
+        decompressor = self._decompressors.get(key)
+        if decompressor is None:
+            decompressor = self._decompressors[key] = self._zstd().ZstdDecompressor(dict_data=dictionary)
+        return decompressor
+
+    def encode(self, text: str) -> bytes:
+        raw = text.encode("utf-8")
+        if self.codec == "off":
+            return bytes((RAW,)) + raw
+
+        compressed = None
+        if self.codec == "zstd":
+            dictionary = self._load_dictionary()
+            if dictionary is not None:
+                compressed = (bytes((ZSTD_DICT,)) + dictionary.dict_id().to_bytes(4, "big")
+                              + self._zstd_compressor().compress(raw))
+            elif len(raw) >= self.min_bytes:
+                compressed = bytes((ZSTD,)) + self._zstd_compressor().compress(raw)
+        elif len(raw) >= self.min_bytes:
+            compressed = bytes((ZLIB,)) + zlib.compress(raw, self.level)
+
+        if compressed is not None and len(compressed) < len(raw) + 1:
+            return compressed
+        return bytes((RAW,)) + raw
+
+    def decode(self, value: bytes) -> str:
+        value = bytes(value)  # asyncpg hands bytea out as bytes, psycopg2 as memoryview
+        header = value[0]
+        if header == RAW:
+            return value[1:].decode("utf-8")
+        if header == ZLIB:
+            return zlib.decompress(value[1:]).decode("utf-8")
+        if header == ZSTD:
+            return self._zstd_decompressor().decompress(value[1:]).decode("utf-8")
+        if header == ZSTD_DICT:
+            dict_id = int.from_bytes(value[1:5], "big")
+            dictionary = self._load_dictionary()
+            if dictionary is None or dictionary.dict_id() != dict_id:
+                raise RuntimeError(f"Content was compressed with zstd dictionary {dict_id}, "
+                                   f"CONTENT_COMPRESSION_DICT does not have it")
+            return self._zstd_decompressor(dictionary).decompress(value[5:]).decode("utf-8")
+        raise ValueError(f"Unknown compressed content header: {header}")
+
+
+text_codec = TextCodec(
+    settings.CONTENT_COMPRESSION,
+    settings.CONTENT_COMPRESSION_MIN_BYTES,
+    settings.CONTENT_COMPRESSION_LEVEL,
+    settings.CONTENT_COMPRESSION_DICT,
+)
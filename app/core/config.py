@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,6 +9,92 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Database engine and connection pool
+    DB_ECHO: bool = False  # log every SQL statement
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # replace connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg statement cache, 0 behind pgbouncer
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_REPLICA_URL: Optional[str] = None  # read replica for safe GET routes (same driver as DATABASE_URL)
+    DB_REPLICA_STICKY_SECONDS: float = 5.0  # after a user's write, their reads stay on the primary this long
+    # Shared cache for rendered HTML, signed-in users, grammar results
+    CACHE_BACKEND: str = "memory"  # memory (per process), file (SQLite file per host) or redis
+    CACHE_URL: Optional[str] = None  # file path for file, redis://host:port/db for redis
+    CACHE_MAX_ENTRIES: int = 50000  # memory backend only
+    RENDER_CACHE_TTL_SECONDS: float = 3600
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    NOTE_CACHE_TTL_SECONDS: float = 300  # GET /notes/ and /notes/{id} responses, 0 disables
+    NOTE_CACHE_IN_MEMORY: bool = False  # also cache them with CACHE_BACKEND=memory (only safe with one worker)
+
+    NOTE_EVENTS_BACKEND: str = "memory"  # memory (per process) or postgres (LISTEN/NOTIFY, all workers)
+    NOTE_EVENTS_QUEUE_SIZE: int = 100  # per stream; a client this far behind is dropped and resumes
+    NOTE_EVENTS_HEARTBEAT_SECONDS: float = 15
+    NOTE_EVENTS_REPLAY_LIMIT: int = 1000  # further behind than this gets a resync event
+
+    CONTENT_COMPRESSION: str = "zlib"  # note/revision bodies at rest: off, zlib or zstd (pip install zstandard)
+    CONTENT_COMPRESSION_MIN_BYTES: int = 512  # smaller bodies stay raw (unless a zstd dictionary is set)
+    CONTENT_COMPRESSION_LEVEL: Optional[int] = None  # codec default: zlib 6, zstd 3
+    CONTENT_COMPRESSION_DICT: Optional[str] = None  # zstd dictionary file, see scripts/train_content_dict.py
+
+    TRASH_RETENTION_DAYS: float = 30  # deleted notes are purged after this, 0 keeps them forever
+    TRASH_PURGE_BATCH_SIZE: int = 500
+    TRASH_PURGE_INTERVAL_SECONDS: float = 3600
+
+    HTML_SANITIZER: str = "nh3"  # nh3 or bleach, same allow-list policy
+
+    BULK_CHUNK_SIZE: int = 200  # operations per transaction / batched statement in POST /notes/bulk
+
+    SCHEMA_CHECK: str = "warn"  # startup alembic version check: strict, warn or off
+
+    # Per-request SQL budget / N+1 detection (for dev and test runs)
+    QUERY_BUDGET_ENABLED: bool = False
+    QUERY_BUDGET_DEFAULT: int = 20  # max statements per request without @query_budget
+    QUERY_BUDGET_MAX_REPEATS: int = 3  # same statement more often than this looks like N+1
+
+    # Per-request profiling for requests sending X-Profile: <PROFILING_TOKEN> (see app/core/profiling.py)
+    PROFILING_ENABLED: bool = False  # off: the middleware and SQL hooks aren't installed at all
+    PROFILING_TOKEN: Optional[str] = None  # required when enabled; also guards /system/profiles
+    SYSTEM_TOKEN: Optional[str] = None  # X-System-Token for the /system diagnostics (all but /system/ready); unset disables them
+    PROFILING_DIR: str = "profiles"
+    PROFILING_KEEP: int = 50  # newest profiles kept on disk
+
+    # Grammar checking backend (LanguageTool compatible)
+    GRAMMAR_CHECKER: str = "languagetool"
+    LANGUAGETOOL_URL: str = "https://api.languagetool.org/v2/check"
+    GRAMMAR_LANGUAGE: str = "en-US"
+    GRAMMAR_LEVEL: str = "default"  # LanguageTool rule level: default or picky
+    GRAMMAR_CONNECT_TIMEOUT: float = 5.0
+    GRAMMAR_TIMEOUT: float = 30.0
+    GRAMMAR_MAX_CONNECTIONS: int = 20
+    GRAMMAR_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GRAMMAR_KEEPALIVE_EXPIRY: float = 30.0
+    GRAMMAR_CHUNK_SIZE: int = 5000  # max characters per backend request
+    GRAMMAR_MAX_CONCURRENCY: int = 4  # parallel chunk requests per check
+    GRAMMAR_MARKDOWN_AWARE: bool = True  # only send prose, skip code/tables/html/urls
+    GRAMMAR_CACHE_MAX_ENTRIES: int = 10000  # 0 disables the paragraph cache (size is set by the cache backend)
+    GRAMMAR_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    # Resilience around backend calls: deadlines, retries, hedging, circuit breaker
+    GRAMMAR_ATTEMPT_TIMEOUT: float = 10.0
+    GRAMMAR_TOTAL_TIMEOUT: float = 25.0
+    GRAMMAR_MAX_RETRIES: int = 2  # on 429/5xx, timeouts and connection errors
+    GRAMMAR_RETRY_BACKOFF: float = 0.2  # base of the jittered exponential backoff
+    GRAMMAR_HEDGE_ENABLED: bool = False  # send a second request after the p95 latency
+    GRAMMAR_HEDGE_MIN_DELAY: float = 0.05
+    GRAMMAR_BREAKER_FAILURES: int = 5  # consecutive failures that open the breaker
+    GRAMMAR_BREAKER_RESET_SECONDS: float = 30.0
+    GRAMMAR_JOB_WORKERS: int = 4  # in-process workers running grammar jobs
+    GRAMMAR_JOB_QUEUE_SIZE: int = 1000
+    GRAMMAR_JOB_STALE_SECONDS: float = 300  # running (or queued) jobs older than this are re-queued
+    GRAMMAR_JOB_REAP_INTERVAL_SECONDS: float = 60  # how often to look for them
+    GRAMMAR_BATCH_CONCURRENCY: int = 8  # revisions checked at once by batch audits
+    GRAMMAR_BATCH_WRITE_SIZE: int = 50  # revisions per bulk issue write
+    GRAMMAR_BATCH_WORKERS: int = 1  # in-process workers running batches from the API
+    GRAMMAR_BATCH_QUEUE_SIZE: int = 100
+    GRAMMAR_BATCH_STALE_SECONDS: float = 3600  # running (or queued) batches older than this are re-queued
+
     class Config:
         env_file = ".env"
 
@@ -1,11 +1,207 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.cache import Cache
 from app.core.config import settings #import from .env
+from app.core.jwt import decode_access_token
+from app.core.metrics import instrument_engine, registry
+from app.core.profiling import install_profiling
+from app.core.query_budget import install_query_log
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that also records how long checkouts wait"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.connect_errors = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            # opening a new connection failed (unreachable server, bad credentials, ...)
+            self.connect_errors += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def build_engine(url: Optional[str] = None, **overrides) -> AsyncEngine:
+    """Create the async engine from Settings; keyword overrides are for load tests"""
+    options = {
+        "echo": settings.DB_ECHO,
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            # asyncpg's own prepared statement cache, and SQLAlchemy's adapter cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    }
+    options.update(overrides)
+    async_engine = create_async_engine(url or settings.DATABASE_URL, **options)
+    instrument_engine(async_engine.sync_engine)
+    install_query_log(async_engine.sync_engine)
+    if settings.PROFILING_ENABLED:
+        install_profiling(async_engine.sync_engine)
+    return async_engine
+
+
+def pool_stats(async_engine: AsyncEngine) -> dict:
+    pool = async_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": getattr(pool, "_max_overflow", settings.DB_MAX_OVERFLOW),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": getattr(pool, "checkouts", None),
+        "wait_seconds_total": round(getattr(pool, "wait_seconds_total", 0.0), 6),
+        "wait_seconds_max": round(getattr(pool, "wait_seconds_max", 0.0), 6),
+        "timeouts": getattr(pool, "timeouts", None),
+        "connect_errors": getattr(pool, "connect_errors", None),
+    }
+
+
+def _collect_pool():
+    engines = {"primary": engine}
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+    stats = {name: pool_stats(e) for name, e in engines.items()}
+
+    connections = []
+    for name, values in stats.items():
+        connections.append(("db_pool_connections", {"engine": name, "state": "checked_out"}, values["checked_out"]))
+        connections.append(("db_pool_connections", {"engine": name, "state": "idle"}, values["checked_in"]))
+    yield "db_pool_connections", "gauge", "Pooled connections by state", connections
+
+    totals = (
+        ("db_pool_checkouts_total", "Connections handed out by the pool", "checkouts"),
+        ("db_pool_checkout_wait_seconds_total", "Time spent waiting for a pooled connection", "wait_seconds_total"),
+        ("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection", "timeouts"),
+        ("db_pool_connect_errors_total", "Checkouts that failed to open a new connection", "connect_errors"),
+    )
+    for metric, documentation, key in totals:
+        yield metric, "counter", documentation, [
+            (metric, {"engine": name}, values[key] or 0) for name, values in stats.items()
+        ]
+
+
+class StickyPrimary:
+    """Users who wrote recently; their reads go to the primary until the window ends.
+
+    Gives read-your-writes on top of an asynchronously replicated replica.
+    Marks are kept in this process and in the shared cache, so with a
+    file or redis cache backend they also cover the other workers.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._until: Dict[UUID, float] = {}
+        self.cache = Cache("sticky", window_seconds)
+        self._pending = set()
+
+    def mark(self, user_id: UUID) -> None:
+        now = time.monotonic()
+        self._until[user_id] = now + self.window_seconds
+        if len(self._until) > 10000:
+            self._until = {uid: until for uid, until in self._until.items() if until > now}
+
+        # Called from a (sync) session event, so the shared mark is stored in the background
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.cache.set(str(user_id), b"1"))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def is_sticky(self, user_id: Optional[UUID]) -> bool:
+        if user_id is None:
+            return False
+        if self._until.get(user_id, 0) > time.monotonic():
+            return True
+        if settings.CACHE_BACKEND == "memory":
+            return False  # nothing shared beyond this process
+        return await self.cache.get(str(user_id)) is not None
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+sticky_primary = StickyPrimary(settings.DB_REPLICA_STICKY_SECONDS)
+
+
+class PrimarySession(Session):
+    """Session on the primary; remembers whether it wrote, for the sticky window"""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _after_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _after_commit(session):
+    # user_id is put on the session by get_current_user
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        sticky_primary.mark(session.info["user_id"])
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("wrote", None)
+
+
+# One engine (and pool) for the whole process
+engine = build_engine()
+
+# Optional read replica; read-only at the session level as a safety net
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = build_engine(
+        settings.DATABASE_REPLICA_URL,
+        connect_args={
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {"default_transaction_read_only": "on"},
+        },
+    )
+
+registry.add_collector(_collect_pool)
 
 AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+    engine, class_=AsyncSession, sync_session_class=PrimarySession, expire_on_commit=False
+)
+
+ReadSessionLocal = sessionmaker(
+    replica_engine or engine, class_=AsyncSession, expire_on_commit=False
 )
 
 async def get_db():
@@ -16,4 +212,29 @@ async def get_db():
             await session.close()
 
 
+def _request_user_id(request: Request) -> Optional[UUID]:
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    try:
+        return UUID(payload["user_id"]) if payload and payload.get("user_id") else None
+    except ValueError:
+        return None
+
 
+async def get_read_db(request: Request):
+    """Session for read-only routes: the replica if configured, else the primary.
+
+    A user who wrote within the last DB_REPLICA_STICKY_SECONDS reads from
+    the primary, so they always see their own changes.
+    """
+    use_replica = replica_engine is not None and not await sticky_primary.is_sticky(_request_user_id(request))
+    session_factory = ReadSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as session:
+        session.info["replica"] = use_replica
+        try:
+            yield session
+        finally:
+            await session.close()
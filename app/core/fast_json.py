@@ -0,0 +1,31 @@
+from typing import Any, Iterable, List, Type
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def projection(schema: Type[BaseModel], model, exclude: Iterable[str] = ()) -> list:
+    """Columns of model for the fields of schema, in the schema's field order.
+
+    Selecting these instead of whole ORM objects gives plain row tuples
+    that map straight onto the response, without building ORM instances
+    or validating Pydantic models per row.
+    """
+    return [getattr(model, name) for name in schema.model_fields if name not in exclude]
+
+
+def field_names(schema: Type[BaseModel], exclude: Iterable[str] = ()) -> List[str]:
+    return [name for name in schema.model_fields if name not in exclude]
+
+
+def dumps(content: Any) -> bytes:
+    """orjson, writing UTC datetimes with a Z suffix like Pydantic does"""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse whose output matches the response_model JSON (see dumps)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,231 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.query_budget import fingerprint
+
+PROFILE_HEADER = "x-profile"
+PROFILES_PATH = "/system/profiles"  # sends the header to authenticate, not to be profiled
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class RequestProfile:
+    """Timed spans (render, grammar backend calls, SQL) of one profiled request"""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.status: Optional[int] = None
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[dict] = []
+
+    def add(self, name: str, start: float, end: float, detail: Optional[str] = None) -> None:
+        self.spans.append({
+            "name": name,
+            "start_ms": round((start - self.start) * 1e3, 3),
+            "duration_ms": round((end - start) * 1e3, 3),
+            "detail": detail,
+        })
+
+    def summary(self) -> dict:
+        totals: Dict[str, dict] = {}
+        for span in self.spans:
+            total = totals.setdefault(span["name"], {"count": 0, "duration_ms": 0.0})
+            total["count"] += 1
+            total["duration_ms"] = round(total["duration_ms"] + span["duration_ms"], 3)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1e3, 3),
+            "span_totals": totals,
+        }
+
+
+# Set by ProfilingMiddleware for a profiled request only
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+@contextmanager
+def profile_span(name: str, detail: Optional[str] = None):
+    """Time the block as a span of the current request's profile; does nothing when it isn't profiled"""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, start, time.perf_counter(), detail)
+
+
+def install_profiling(sync_engine) -> None:
+    """Record every SQL statement of a profiled request as a "db" span (only installed with PROFILING_ENABLED)"""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["profile_start"].pop()
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add("db", start, time.perf_counter(), fingerprint(statement)[:300])
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        starts = exception_context.connection.info.get("profile_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+
+class ProfileStore:
+    """Profiles on disk: <id>.prof (cProfile, for pstats/snakeviz) and <id>.json (spans and top functions)"""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+
+    def path(self, profile_id: str, suffix: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{suffix}")
+        return path if os.path.exists(path) else None
+
+    def save(self, profile: RequestProfile, profiler: cProfile.Profile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.directory, f"{profile.id}.prof"))
+
+        top = io.StringIO()
+        pstats.Stats(profiler, stream=top).sort_stats("cumulative").print_stats(40)
+        report = profile.summary()
+        report["spans"] = profile.spans
+        report["top_functions"] = top.getvalue()
+        with open(os.path.join(self.directory, f"{profile.id}.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        self.prune()
+
+    def prune(self) -> None:
+        reports = sorted(self._reports(), key=os.path.getmtime, reverse=True)
+        for path in reports[self.keep:]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(path[:-len(".json")] + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def _reports(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+
+    def load(self, profile_id: str) -> Optional[dict]:
+        path = self.path(profile_id, "json")
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def list(self) -> List[dict]:
+        """Summaries, newest first"""
+        summaries = []
+        for path in sorted(self._reports(), key=os.path.getmtime, reverse=True):
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+            summaries.append({key: report[key] for key in ("id", "method", "path", "status", "started_at", "duration_ms")})
+        return summaries
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_KEEP)
+
+
+def valid_profiling_token(value: Optional[str]) -> bool:
+    token = settings.PROFILING_TOKEN
+    return bool(token) and value is not None and hmac.compare_digest(value.encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    """Runs requests that send X-Profile: <PROFILING_TOKEN> under cProfile (opt-in, PROFILING_ENABLED).
+
+    The profile and the request's render, grammar and SQL spans are saved
+    to PROFILING_DIR; the response carries X-Profile-Id to fetch them from
+    /system/profiles. One request per worker is profiled at a time, and
+    cProfile sees everything the event loop runs meanwhile, so profile on
+    a quiet worker (the spans are exact either way). Without the header a
+    request only pays for one header scan.
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = next((v for k, v in scope["headers"] if k == PROFILE_HEADER.encode()), None)
+        if (value is None or scope["path"].startswith(PROFILES_PATH)
+                or not valid_profiling_token(value.decode("latin-1"))):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-skipped", b"busy"))
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler (e.g. coverage) is active
+            await self.app(scope, receive, self._with_header(send, b"x-profile-skipped", b"profiler-in-use"))
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        self._active = True
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, self._with_header(send_wrapper, b"x-profile-id", profile.id.encode()))
+        finally:
+            profiler.disable()
+            current_profile.reset(token)
+            self._active = False
+            profile.duration = time.perf_counter() - profile.start
+            try:
+                await asyncio.to_thread(self.store.save, profile, profiler)
+                print(f"🔬 Profiled {profile.method} {profile.path} in {profile.duration * 1e3:.0f} ms: {profile.id}")
+            except Exception as e:
+                print(f"❌ Could not save profile {profile.id}: {e}")
+
+    @staticmethod
+    def _with_header(send, name: bytes, value: bytes):
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (name, value)]}
+            await send(message)
+        return send_with_header
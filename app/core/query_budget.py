@@ -0,0 +1,231 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"(\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement with literals and parameters replaced, so repeats of a query compare equal.
+
+    IN lists and multi-row VALUES of any length collapse to one form.
+    """
+    normalized = _STRING.sub("?", statement)
+    normalized = _PARAM.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _LIST.sub("(?...)", normalized)
+    normalized = _ROWS.sub(r"\1, ...", normalized)
+    return _SPACE.sub(" ", normalized).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request (or tracked block) ran more SQL than its budget allows"""
+
+
+class QueryLog:
+    """SQL statements executed inside one request or tracked block"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def fingerprints(self) -> Counter:
+        return Counter(fingerprint(statement) for statement in self.statements)
+
+    def repeated(self, max_repeats: int) -> Dict[str, int]:
+        """Fingerprints that ran more than max_repeats times (likely N+1 loops)"""
+        return {fp: n for fp, n in self.fingerprints().most_common() if n > max_repeats}
+
+    def problems(self, max_queries: Optional[int], max_repeats: Optional[int]) -> List[str]:
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries, budget is {max_queries}")
+        if max_repeats is not None:
+            for fp, n in self.repeated(max_repeats).items():
+                problems.append(f"{n}x {fp}")
+        return problems
+
+
+current_query_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+
+def record_statement(statement: str) -> None:
+    """Called by the engine hook for every statement"""
+    log = current_query_log.get()
+    if log is not None:
+        log.statements.append(statement)
+
+
+def install_query_log(sync_engine) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_statement(statement)
+
+
+def query_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """Declare the SQL budget of an endpoint (checked by QueryBudgetMiddleware)"""
+    def decorator(endpoint):
+        endpoint.__query_budget__ = (max_queries, max_repeats)
+        return endpoint
+    return decorator
+
+
+@contextmanager
+def track_queries(max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+    """Collect the statements run inside the block, for tests of service code.
+
+        with track_queries(max_queries=3, max_repeats=1) as log:
+            await get_notes(db, user.id)
+
+    Raises QueryBudgetExceeded on leaving the block if a limit was broken.
+    """
+    log = QueryLog()
+    token = current_query_log.set(log)
+    try:
+        yield log
+    finally:
+        current_query_log.reset(token)
+    problems = log.problems(max_queries, max_repeats)
+    if problems:
+        raise QueryBudgetExceeded("Query budget exceeded:\n  " + "\n  ".join(problems))
+
+
+class RouteQueryStats:
+    __slots__ = ("requests", "queries", "max_queries", "violations", "repeated")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.violations = 0
+        self.repeated: Counter = Counter()
+
+
+class QueryReport:
+    """Per-route query counts, budget violations and repeated statements seen so far"""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteQueryStats] = {}
+        self.violations: List[dict] = []
+        self.violations_total = 0
+
+    def record(self, route: str, log: QueryLog, max_queries: Optional[int], max_repeats: Optional[int]) -> List[str]:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteQueryStats()
+        stats.requests += 1
+        stats.queries += log.count
+        stats.max_queries = max(stats.max_queries, log.count)
+        if max_repeats is not None:
+            for fp, n in log.repeated(max_repeats).items():
+                stats.repeated[fp] = max(stats.repeated[fp], n)
+
+        problems = log.problems(max_queries, max_repeats)
+        if problems:
+            stats.violations += 1
+            self.violations_total += 1
+            self.violations.append({"route": route, "queries": log.count, "problems": problems})
+            del self.violations[:-100]  # keep the latest only
+        return problems
+
+    def worst(self, limit: int = 10) -> List[dict]:
+        ranked = sorted(self.routes.items(), key=lambda item: (item[1].violations, item[1].max_queries), reverse=True)
+        return [
+            {
+                "route": route,
+                "requests": stats.requests,
+                "avg_queries": round(stats.queries / stats.requests, 2),
+                "max_queries": stats.max_queries,
+                "violations": stats.violations,
+                "repeated_statements": dict(stats.repeated.most_common(5)),
+            }
+            for route, stats in ranked[:limit]
+        ]
+
+    def format(self, limit: int = 10) -> str:
+        """Plain text summary, e.g. for the end of a test session"""
+        lines = [f"{'route':<60} {'reqs':>6} {'avg':>6} {'max':>5} {'over':>5}"]
+        for row in self.worst(limit):
+            lines.append(
+                f"{row['route']:<60} {row['requests']:>6} {row['avg_queries']:>6} "
+                f"{row['max_queries']:>5} {row['violations']:>5}"
+            )
+            for fp, n in row["repeated_statements"].items():
+                lines.append(f"    {n}x {fp[:120]}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.violations.clear()
+        self.violations_total = 0
+
+
+query_report = QueryReport()
+
+
+@contextmanager
+def expect_query_budgets():
+    """Fail if any request handled inside the block broke its query budget.
+
+    For API tests (the middleware must be enabled), e.g. as a pytest fixture:
+
+        with expect_query_budgets():
+            client.get("/notes/")
+    """
+    seen = query_report.violations_total
+    yield query_report
+    new_count = query_report.violations_total - seen
+    if new_count:
+        new = query_report.violations[-new_count:]
+        details = "\n".join(f"  {v['route']}: " + "; ".join(v["problems"]) for v in new)
+        raise QueryBudgetExceeded("Query budget exceeded:\n" + details)
+
+
+class QueryBudgetMiddleware:
+    """Counts and fingerprints the SQL of every request (opt-in, QUERY_BUDGET_ENABLED).
+
+    Budgets come from @query_budget on the endpoint, or the
+    QUERY_BUDGET_DEFAULT / QUERY_BUDGET_MAX_REPEATS settings. Requests
+    over budget are printed and collected in query_report.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = current_query_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_log.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                max_queries, max_repeats = getattr(
+                    route.endpoint, "__query_budget__",
+                    (settings.QUERY_BUDGET_DEFAULT, settings.QUERY_BUDGET_MAX_REPEATS)
+                )
+                if max_repeats is None:
+                    max_repeats = settings.QUERY_BUDGET_MAX_REPEATS
+                label = f"{scope['method']} {route.path}"
+                problems = query_report.record(label, log, max_queries, max_repeats)
+                if problems:
+                    print(f"⚠️ Query budget exceeded on {label}: " + "; ".join(problems))
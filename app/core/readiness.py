@@ -0,0 +1,45 @@
+import time
+from typing import Dict, Optional
+
+
+class Readiness:
+    """Start-up warm-up steps, for the readiness probe.
+
+    The app accepts requests as soon as the cheap start-up checks pass;
+    heavier work (renderer imports, grammar checker, job recovery) runs in
+    the background and the instance reports ready once every step is done.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.steps: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+
+    def expect(self, *steps: str) -> None:
+        for step in steps:
+            self.steps[step] = "pending"
+        self.ready_at = None
+
+    def done(self, step: str) -> None:
+        self.steps[step] = "done"
+        if self.is_ready():
+            self.ready_at = time.monotonic()
+
+    def fail(self, step: str, error: Exception) -> None:
+        self.steps[step] = "failed"
+        self.errors[step] = str(error) or type(error).__name__
+
+    def is_ready(self) -> bool:
+        return all(state == "done" for state in self.steps.values())
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "steps": dict(self.steps),
+            "errors": dict(self.errors),
+            "warm_up_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+        }
+
+
+readiness = Readiness()
@@ -0,0 +1,67 @@
+import re
+from pathlib import Path
+from typing import Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+_REVISION = re.compile(r"^revision\b[^=]*=\s*['\"]([0-9A-Za-z_]+)['\"]", re.M)
+_DOWN_REVISION = re.compile(r"^down_revision\b[^=]*=(.*)$", re.M)
+_QUOTED = re.compile(r"['\"]([0-9A-Za-z_]+)['\"]")
+
+# The schema older versions built with Base.metadata.create_all instead of alembic
+CREATE_ALL_REVISION = "48ee314c995c"
+
+
+class SchemaVersionError(RuntimeError):
+    """The database is not migrated to the revision this code expects"""
+
+
+def migration_heads(versions_dir: Path = VERSIONS_DIR) -> Set[str]:
+    """Head revisions of the alembic history.
+
+    Reads only the revision/down_revision header lines of the migration
+    files, which is much cheaper than loading alembic's ScriptDirectory
+    (that imports every migration module).
+    """
+    revisions = set()
+    parents = set()
+    for path in versions_dir.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision:
+            parents.update(_QUOTED.findall(down_revision.group(1)))
+    return revisions - parents
+
+
+async def database_revisions(async_engine: AsyncEngine) -> Set[str]:
+    async with async_engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        return set(result.scalars().all())
+
+
+async def check_schema(async_engine: AsyncEngine) -> Set[str]:
+    """Raise SchemaVersionError unless the database is at the migration head(s)"""
+    expected = migration_heads()
+    try:
+        current = await database_revisions(async_engine)
+    except ProgrammingError as e:
+        # no alembic_version table: the database was never migrated
+        raise SchemaVersionError(
+            "Database has no alembic_version table; run `alembic upgrade head`, or for a database "
+            f"created by an older version with create_all, `alembic stamp {CREATE_ALL_REVISION}` first"
+        ) from e
+
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database is at {sorted(current) or 'no revision'}, code expects {sorted(expected)}; "
+            f"run `alembic upgrade head`"
+        )
+    return current
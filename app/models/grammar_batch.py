@@ -0,0 +1,34 @@
+from uuid import uuid4
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Index, text
+from datetime import datetime
+from app.models.user import Base
+from app.models.grammar_job import JOB_QUEUED
+
+
+class GrammarBatch(Base):
+    __tablename__ = "grammar_batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    note_ids = Column(JSONB, nullable=False, default=list)  # selection: note ids (as strings) and/or tag
+    tag = Column(String, nullable=True)
+
+    status = Column(String, nullable=False, default=JOB_QUEUED)  #queued, running, done, failed
+    report = Column(JSONB, nullable=True)  # GrammarBatchReport once done
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # at most one active batch per user, resubmissions return it
+        Index(
+            "ux_grammar_batches_active_owner",
+            "owner_id",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
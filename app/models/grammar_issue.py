@@ -1,6 +1,6 @@
 import uuid
 from uuid import uuid4
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Text, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -20,7 +20,7 @@ class GrammarIssue(Base):
 
     context = Column(Text, nullable=True)
 
-    replacements = Column(Text, nullable=True)  #  suggested fixes
+    replacements = Column(JSONB, nullable=True)  #  suggested fixes, list of strings
 
     issue_type = Column(String, nullable=True)
     rule_id = Column(String, nullable=True)
@@ -0,0 +1,39 @@
+from uuid import uuid4
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Text, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.models.user import Base
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class GrammarJob(Base):
+    __tablename__ = "grammar_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, nullable=False)
+    revision_id = Column(UUID(as_uuid=True), ForeignKey("note_revisions.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    status = Column(String, nullable=False, default=JOB_QUEUED)  #queued, running, done, failed
+    total_issues = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    revision = relationship("NoteRevision")
+
+    __table_args__ = (
+        # at most one active job per revision, duplicate submissions are coalesced
+        Index(
+            "ux_grammar_jobs_active_revision",
+            "revision_id",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
@@ -1,18 +1,28 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey
+from sqlalchemy import BigInteger, Column, DateTime, Index, Sequence, String, Boolean, ForeignKey, event, false, func, select, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.sql import Select
 import uuid
 
+from app.models.types import CompressedText
 from app.models.user  import Base
 
+# Every insert or change of a note takes the next value, so change_seq
+# orders one owner's changes (see lock_owner_changes below)
+note_change_seq = Sequence("note_change_seq")
+
+
 class Note(Base):
     __tablename__ = "notes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
-    content = Column(String, nullable=True)
+    content = Column(CompressedText, nullable=True)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    is_deleted = Column(Boolean, default=False)
+    is_deleted = Column(Boolean, default=False, server_default=false(), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # when it went to the trash
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    change_seq = Column(BigInteger, note_change_seq, server_default=note_change_seq.next_value(), nullable=False)
 
     revisions = relationship(
         "NoteRevision",
@@ -26,3 +36,56 @@ class Note(Base):
         back_populates="notes"
     )
     owner = relationship("User")
+
+    __table_args__ = (
+        Index("ix_notes_owner_id_change_seq", "owner_id", "change_seq"),
+        # reads only ever look at live notes, the trash at deleted ones
+        Index("ix_notes_owner_id_live", "owner_id", postgresql_where=text("is_deleted = false")),
+        Index("ix_notes_owner_id_trash", "owner_id", "deleted_at", postgresql_where=text("is_deleted = true")),
+        Index("ix_notes_trash_deleted_at", "deleted_at", postgresql_where=text("is_deleted = true")),
+    )
+    # read updated_at / change_seq back with RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+
+def owner_lock(owner_id) -> Select:
+    """SELECT taking the per-owner change lock (Postgres) until the transaction ends.
+
+    The lock is re-entrant, so taking it before the flush does is fine.
+    """
+    return select(func.pg_advisory_xact_lock(func.hashtext(str(owner_id))))
+
+
+@event.listens_for(Session, "before_flush")
+def lock_owner_changes(session, flush_context, instances):
+    """Give changed notes a new change_seq and updated_at, in commit order per owner.
+
+    Sequence values are handed out when the statement runs, not at commit,
+    so two concurrent transactions could commit seq 11 before seq 10 and a
+    change feed reader at 11 would never see 10. Holding a per-owner
+    advisory lock until commit makes one owner's writers take turns.
+    Tag-only changes count too, since they change the note's response.
+    """
+    changed = [obj for obj in session.new if isinstance(obj, Note)]
+    changed += [obj for obj in session.dirty if isinstance(obj, Note) and session.is_modified(obj)]
+    if not changed:
+        return
+
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        locked = session.info.setdefault("change_locks", set())
+        for owner_id in sorted({str(note.owner_id) for note in changed} - locked):
+            connection.execute(owner_lock(owner_id))
+            locked.add(owner_id)
+
+    for note in changed:
+        if note not in session.new:
+            note.change_seq = note_change_seq.next_value()
+            note.updated_at = func.now()
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def release_owner_changes(session):
+    # advisory xact locks end with the transaction
+    session.info.pop("change_locks", None)
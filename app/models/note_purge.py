@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.user import Base
+
+
+class NotePurgeWatermark(Base):
+    """Highest change_seq among an owner's notes purged from the trash.
+
+    Purged notes leave the change feed; a client whose cursor is below
+    this may still hold one of them and has to sync from scratch.
+    """
+    __tablename__ = "note_purge_watermarks"
+
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    purged_through = Column(BigInteger, nullable=False)
+
+
+async def purged_through(db: AsyncSession, owner_id) -> int:
+    result = await db.execute(
+        select(NotePurgeWatermark.purged_through).where(NotePurgeWatermark.owner_id == owner_id)
+    )
+    return result.scalar_one_or_none() or 0
@@ -5,6 +5,7 @@ from sqlalchemy.dialects.postgresql import UUID  # native uuid for the postgresq
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from app.models.types import CompressedText
 from app.models.user import Base
 
 
@@ -16,9 +17,9 @@ class NoteRevision(Base):
         default=uuid4,
         nullable=False
     )
-    note_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="CASCADE"))
+    note_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="CASCADE"), index=True)
     title = Column(String, nullable=False)
-    content = Column(String, nullable=False)
+    content = Column(CompressedText, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     note = relationship("Note", back_populates="revisions")
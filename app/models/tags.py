@@ -5,8 +5,8 @@ from app.models.user import Base
 note_tags = Table( #many-many table , to have each note has multi tags , and the tags belongs to multi notes
     "note_tags",
     Base.metadata,
-    Column("note_id", ForeignKey("notes.id")),
-    Column("tag_id", ForeignKey("tags.id")),
+    Column("note_id", ForeignKey("notes.id", ondelete="CASCADE")),
+    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), index=True),
 )
 
 
@@ -0,0 +1,27 @@
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.compression import text_codec
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as bytea with a format header, compressed by text_codec.
+
+    Python sees plain str; bodies are compressed on write and decompressed
+    when a query selects the column, so column projections that leave the
+    content out never pay for it. SQL can't see inside the bytes: compare
+    or search in Python, or on a column that stays text.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return text_codec.encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return text_codec.decode(value)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
@@ -16,15 +16,20 @@ class GrammarIssueOut(BaseModel):
     offset: int
     length: int
     context: Optional[str]
-    replacements: List[str]  #fixes
+    replacements: List[str] = []  #fixes
     issue_type: Optional[str]
     rule_id: Optional[str]
     category: Optional[str]
     is_applied: bool
     created_at: datetime
 
+    @field_validator("replacements", mode="before")
+    @classmethod
+    def no_replacements(cls, value):
+        return [] if value is None else value  # NULL in rows from before the JSONB column
+
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class GrammarCheckResponse(BaseModel):
@@ -33,12 +38,73 @@ class GrammarCheckResponse(BaseModel):
     issues: List[GrammarIssueOut]
 
 
+class GrammarJobOut(BaseModel):# queued grammar check
+    id: UUID
+    revision_id: UUID
+    status: str  #queued, running, done, failed
+    total_issues: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class GrammarBatchRequest(BaseModel):# notes to audit, by id and/or tag
+    note_ids: List[UUID] = []
+    tag: Optional[str] = None
+
+
+class GrammarBatchFailure(BaseModel):
+    note_id: UUID
+    revision_id: UUID
+    error: str
+
+
+class GrammarBatchSkipped(BaseModel):
+    note_id: UUID
+    reason: str  #no_revision, not_found
+
+
+class GrammarBatchReport(BaseModel):
+    revisions_total: int
+    revisions_checked: int
+    revisions_failed: int
+    issues_total: int
+    writes: int
+    cache_hits: int
+    elapsed_seconds: float
+    failures: List[GrammarBatchFailure]
+    skipped: List[GrammarBatchSkipped] = []
+
+
+class GrammarBatchOut(BaseModel):# queued batch audit
+    id: UUID
+    note_ids: List[UUID]
+    tag: Optional[str]
+    status: str  #queued, running, done, failed
+    report: Optional[GrammarBatchReport]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
 class ApplyFixesRequest(BaseModel):#Request to apply specific fixes
 
     issue_ids: List[UUID]
+    save_as_version: bool = False  # save the result to the note (creates a revision)
 
 
 class ApplyFixesResponse(BaseModel):# Response after applying fixes
     applied_count: int
     new_content: str
     message: str
+    applied_issue_ids: List[UUID] = []
+    conflicting_issue_ids: List[UUID] = []  # overlapping ranges or edited since, not applied
+    saved: bool = False
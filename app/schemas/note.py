@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal, Optional, List
 from uuid import UUID
 from app.schemas.tags import TagOut
 
@@ -25,4 +26,60 @@ class NoteResponse(BaseModel):
     class Config:
         orm_mode = True
     owner_id: UUID
-    is_deleted: bool
\ No newline at end of file
+    is_deleted: bool
+    change_seq: int  # version of the note, see GET /notes/changes
+    updated_at: datetime
+    deleted_at: Optional[datetime] = None  # set while the note is in the trash
+
+
+class NoteChanges(BaseModel):
+    changes: List[NoteResponse]  # deleted notes come with is_deleted=true
+    cursor: int  # pass as since= on the next call
+    has_more: bool
+    resync: bool = False  # notes were purged past since: drop local copies, sync again from since=0
+
+
+class NoteEditOp(BaseModel):
+    offset: int = Field(ge=0)  # in characters (code points) of the base content
+    delete: int = Field(0, ge=0)  # characters removed at offset
+    insert: str = ""
+
+
+class NotePatch(BaseModel):
+    base_version: int  # change_seq of the content the edits were made against
+    edits: List[NoteEditOp] = Field(default=[], max_length=10000)  # offsets refer to the base content
+    title: Optional[str] = None
+
+
+class NotePatchResult(BaseModel):
+    id: UUID
+    change_seq: int
+    updated_at: datetime
+    content_length: int
+    content_sha256: str  # of the new content (UTF-8), to check the client's copy
+
+
+class BulkNoteOp(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[UUID] = None  # update / delete
+    title: Optional[str] = None  # required for create
+    content: Optional[str] = None
+    tags: List[str] = []  # update: empty keeps the current tags, like PUT
+
+
+class BulkNoteRequest(BaseModel):
+    operations: List[BulkNoteOp] = Field(max_length=1000)
+    atomic: bool = False  # all or nothing, in one transaction
+
+
+class BulkNoteResult(BaseModel):
+    index: int
+    op: str
+    status: int  # HTTP status of the operation on its own
+    id: Optional[UUID] = None
+    change_seq: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkNoteResponse(BaseModel):
+    results: List[BulkNoteResult]
@@ -1,21 +1,52 @@
+from uuid import UUID
+
+import orjson
 from fastapi import Depends,HTTPException,status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.database import get_db
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db, get_read_db
+from app.core.metrics import register_cache
 from app.core.jwt import decode_access_token
 from app.models.user import User
 from fastapi.security import OAuth2PasswordBearer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Verified users by id (never the password hash), so most requests skip the users query
+user_cache = Cache("user", settings.AUTH_CACHE_TTL_SECONDS)
+register_cache("user", user_cache.stats)
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ):
+    user = await _user_from_token(token, db)
+    # lets the session put this user on the primary after a write (read-your-writes)
+    db.info["user_id"] = user.id
+    return user
+
+
+async def get_current_reader(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """get_current_user for read-only routes, looked up through the read session"""
+    try:
+        return await _user_from_token(token, db)
+    except HTTPException as e:
+        if e.status_code != 404 or not db.info.get("replica"):
+            raise
+    # a just-registered user may not have reached the replica yet
+    async with AsyncSessionLocal() as primary:
+        return await _user_from_token(token, primary)
+
+
+async def _user_from_token(token: str, db: AsyncSession) -> User:
     payload = decode_access_token(token)
 
     if payload is None:
@@ -26,6 +57,11 @@ async def get_current_user(
 #after decode the token , i need to know the user logged in , when use the jwt to let know who is own the notes
     user_id = payload.get("user_id")
 
+    cached = await user_cache.get(str(user_id))
+    if cached is not None:
+        fields = orjson.loads(cached)
+        return User(id=UUID(fields["id"]), full_name=fields["full_name"], email=fields["email"])
+
     result = await db.execute(
         select(User).where(User.id == user_id)
     )
@@ -38,4 +74,8 @@ async def get_current_user(
             detail="User not found"
         )
 
-    return user
\ No newline at end of file
+    await user_cache.set(
+        str(user.id),
+        orjson.dumps({"id": user.id, "full_name": user.full_name, "email": user.email})
+    )
+    return user
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from typing import Callable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.grammar_batch import GrammarBatch
+from app.models.grammar_job import JOB_QUEUED
+from app.models.note import Note
+from app.models.note_revision import NoteRevision
+from app.models.tags import Tag, note_tags
+from app.schemas.grammar import GrammarBatchReport
+from app.services.grammar_cache import grammar_cache
+from app.services.grammar_jobs import JobQueue
+from app.services.grammar_service import GrammarService
+
+
+def _selected(query, owner_id: Optional[UUID], note_ids: Optional[List[UUID]], tag: Optional[str]):
+    """Restrict a query over Note to the live notes a batch selects"""
+    query = query.where(Note.is_deleted == False)
+    if owner_id is not None:
+        query = query.where(Note.owner_id == owner_id)
+    if note_ids:
+        query = query.where(Note.id.in_(note_ids))
+    if tag:
+        query = (
+            query.join(note_tags, note_tags.c.note_id == Note.id)
+            .join(Tag, note_tags.c.tag_id == Tag.id)
+            .where(Tag.name == tag)
+        )
+    return query
+
+
+async def latest_revisions(
+        db: AsyncSession,
+        owner_id: Optional[UUID] = None,
+        note_ids: Optional[List[UUID]] = None,
+        tag: Optional[str] = None
+) -> List[NoteRevision]:
+    """Latest revision of every matching (not deleted) note, in one query"""
+    query = _selected(
+        select(NoteRevision)
+        .join(Note, NoteRevision.note_id == Note.id)
+        .distinct(NoteRevision.note_id)
+        .order_by(NoteRevision.note_id, NoteRevision.created_at.desc()),
+        owner_id, note_ids, tag
+    )
+
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def skipped_notes(
+        db: AsyncSession,
+        revisions: List[NoteRevision],
+        owner_id: Optional[UUID] = None,
+        note_ids: Optional[List[UUID]] = None,
+        tag: Optional[str] = None
+) -> List[dict]:
+    """Selected notes the batch can't check: without a revision, or (for
+    requested ids) not found, deleted or without the tag"""
+    result = await db.execute(_selected(select(Note.id), owner_id, note_ids, tag))
+    selected = set(result.scalars().all())
+    checked = {revision.note_id for revision in revisions}
+
+    skipped = [{"note_id": note_id, "reason": "no_revision"} for note_id in selected - checked]
+    skipped += [{"note_id": note_id, "reason": "not_found"} for note_id in dict.fromkeys(note_ids or ())
+                if note_id not in selected]
+    return skipped
+
+
+async def run_batch(
+        db: AsyncSession,
+        owner_id: Optional[UUID] = None,
+        note_ids: Optional[List[UUID]] = None,
+        tag: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+) -> dict:
+    """Grammar check the latest revisions of many notes.
+
+    Revisions are checked through a pipeline limited to
+    GRAMMAR_BATCH_CONCURRENCY concurrent checks, and their issues are
+    written GRAMMAR_BATCH_WRITE_SIZE revisions at a time (one DELETE and
+    one INSERT per write). progress(done, total) is called after each
+    revision. Returns a summary report, including the selected notes
+    that were skipped (no revision, or a requested id not found).
+    """
+    started = time.perf_counter()
+    cache_hits_before = grammar_cache.hits
+
+    revisions = await latest_revisions(db, owner_id, note_ids, tag)
+    skipped = await skipped_notes(db, revisions, owner_id, note_ids, tag)
+    texts = {revision.id: (revision.note_id, f"{revision.title}\n\n{revision.content}") for revision in revisions}
+    # Nothing to hold the connection for while the backend works
+    await db.commit()
+
+    report = {
+        "revisions_total": len(texts),
+        "revisions_checked": 0,
+        "revisions_failed": 0,
+        "issues_total": 0,
+        "writes": 0,
+        "failures": [],
+        "skipped": skipped,
+    }
+    pending_writes = {}
+    semaphore = asyncio.Semaphore(settings.GRAMMAR_BATCH_CONCURRENCY)
+
+    async def check_one(revision_id: UUID):
+        async with semaphore:
+            try:
+                return revision_id, await GrammarService.check_text(texts[revision_id][1]), None
+            except Exception as e:
+                return revision_id, None, str(e) or type(e).__name__
+
+    async def flush():
+        if not pending_writes:
+            return
+        await GrammarService.store_issues(db, pending_writes)
+        await db.commit()
+        report["writes"] += 1
+        pending_writes.clear()
+
+    done = 0
+    for next_result in asyncio.as_completed([check_one(revision_id) for revision_id in texts]):
+        revision_id, matches, error = await next_result
+        done += 1
+        if error is None:
+            pending_writes[revision_id] = matches
+            report["revisions_checked"] += 1
+            report["issues_total"] += len(matches)
+        else:
+            report["revisions_failed"] += 1
+            report["failures"].append({
+                "note_id": texts[revision_id][0],
+                "revision_id": revision_id,
+                "error": error,
+            })
+
+        if len(pending_writes) >= settings.GRAMMAR_BATCH_WRITE_SIZE:
+            await flush()
+        if progress:
+            progress(done, len(texts))
+
+    await flush()
+
+    report["cache_hits"] = grammar_cache.hits - cache_hits_before
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+class GrammarBatchQueue(JobQueue):
+    """Batch audits submitted through the API, at most one active batch per user"""
+
+    model = GrammarBatch
+    label = "batches"
+
+    @property
+    def stale_seconds(self) -> float:
+        return settings.GRAMMAR_BATCH_STALE_SECONDS
+
+    async def submit(self, db: AsyncSession, owner_id: UUID, note_ids: List[UUID], tag: Optional[str]) -> GrammarBatch:
+        """Queue a batch for the user, or return their batch that is still queued or running"""
+        return await self._submit(
+            db,
+            GrammarBatch.owner_id == owner_id,
+            lambda: GrammarBatch(
+                owner_id=owner_id,
+                note_ids=[str(note_id) for note_id in note_ids],
+                tag=tag,
+                status=JOB_QUEUED
+            )
+        )
+
+    async def _execute(self, db: AsyncSession, batch: GrammarBatch) -> dict:
+        report = await run_batch(
+            db,
+            owner_id=batch.owner_id,
+            note_ids=[UUID(note_id) for note_id in batch.note_ids],
+            tag=batch.tag
+        )
+        return {"report": GrammarBatchReport(**report).model_dump(mode="json")}
+
+
+grammar_batches = GrammarBatchQueue(
+    workers=settings.GRAMMAR_BATCH_WORKERS,
+    max_pending=settings.GRAMMAR_BATCH_QUEUE_SIZE,
+)
+
+
+def _collect_queue():
+    yield "grammar_batch_queue_depth", "gauge", "Grammar batches waiting for a worker", [
+        ("grammar_batch_queue_depth", {}, grammar_batches.queue.qsize()),
+    ]
+
+
+registry.add_collector(_collect_queue)
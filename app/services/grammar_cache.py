@@ -0,0 +1,55 @@
+import hashlib
+from typing import Dict, List, Optional
+
+import orjson
+
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.metrics import register_cache
+
+
+def cache_key(language: str, ruleset: str, text: str) -> str:
+    """Key for a checked paragraph: (language, ruleset, paragraph hash)"""
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{language}:{ruleset}:{text_hash}"
+
+
+class GrammarResultCache:
+    """Checker matches per paragraph, in the shared cache ("grammar" namespace).
+
+    Matches are stored with offsets relative to the paragraph, so they can
+    be reused wherever the same paragraph appears in a later revision, by
+    any worker that shares the cache backend. Entries expire after
+    ttl_seconds.
+    """
+
+    def __init__(self, enabled: bool, ttl_seconds: float):
+        self.enabled = enabled
+        self.cache = Cache("grammar", ttl_seconds)
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    async def get_many(self, keys: List[str]) -> List[Optional[List[dict]]]:
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+        return [orjson.loads(value) if value is not None else None for value in await self.cache.get_many(keys)]
+
+    async def set_many(self, entries: Dict[str, List[dict]]) -> None:
+        if self.enabled and entries:
+            await self.cache.set_many({key: orjson.dumps(matches) for key, matches in entries.items()})
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.cache.stats()}
+
+
+grammar_cache = GrammarResultCache(
+    enabled=settings.GRAMMAR_CACHE_MAX_ENTRIES > 0,
+    ttl_seconds=settings.GRAMMAR_CACHE_TTL_SECONDS,
+)
+register_cache("grammar", grammar_cache.stats)
@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class GrammarCheckError(Exception):
+    """Raised when the grammar backend returns an unusable response"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GrammarChecker:
+    """Base class for grammar checking backends.
+
+    A checker takes plain text and returns LanguageTool style match dicts
+    (message, offset, length, replacements, rule, ...).
+    """
+
+    name = "base"
+
+    @property
+    def ruleset(self) -> str:
+        """Identifies the rules in effect; part of the result cache key"""
+        return self.name
+
+    @classmethod
+    def from_settings(cls) -> "GrammarChecker":
+        return cls()
+
+    def is_available(self) -> bool:
+        """False while the backend is known to be failing"""
+        return True
+
+    def retry_after(self) -> float:
+        return 0.0
+
+    def snapshot(self) -> dict:
+        """Health and latency details for the system endpoints"""
+        return {"backend": self.name}
+
+    async def check(self, text: str, language: str) -> List[dict]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class LanguageToolChecker(GrammarChecker):
+    """Checker backed by a LanguageTool server (public API or self-hosted)"""
+
+    name = "languagetool"
+
+    def __init__(self, url: str, client: "httpx.AsyncClient", level: str = "default"):
+        self.url = url
+        self.client = client
+        self.level = level
+
+    @property
+    def ruleset(self) -> str:
+        return f"{self.name}:{self.level}"
+
+    @classmethod
+    def from_settings(cls) -> "LanguageToolChecker":
+        import httpx  # deferred: only needed once the checker is created, not at import
+        # One pooled keep-alive client for the whole process, so checks
+        # reuse open connections instead of paying TCP+TLS on every call
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.GRAMMAR_TIMEOUT, connect=settings.GRAMMAR_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.GRAMMAR_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GRAMMAR_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GRAMMAR_KEEPALIVE_EXPIRY,
+            ),
+        )
+        return cls(settings.LANGUAGETOOL_URL, client, level=settings.GRAMMAR_LEVEL)
+
+    async def check(self, text: str, language: str) -> List[dict]:
+        response = await self.client.post(
+            self.url,
+            data={
+                "text": text,
+                "language": language,
+                "level": self.level,
+            }
+        )
+
+        if response.status_code != 200:
+            raise GrammarCheckError(
+                f"LanguageTool API error: {response.status_code}",
+                status_code=response.status_code
+            )
+
+        return response.json().get("matches", [])
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+CHECKERS: Dict[str, Type[GrammarChecker]] = {
+    LanguageToolChecker.name: LanguageToolChecker,
+}
+
+_checker: Optional[GrammarChecker] = None
+
+
+async def init_checker() -> GrammarChecker:
+    """Create the configured checker (called once at application startup)"""
+    global _checker
+    if _checker is None:
+        checker_class = CHECKERS.get(settings.GRAMMAR_CHECKER)
+        if checker_class is None:
+            raise ValueError(f"Unknown GRAMMAR_CHECKER: {settings.GRAMMAR_CHECKER}")
+        from app.services.grammar_resilience import ResilientChecker
+        _checker = ResilientChecker.wrap(checker_class.from_settings())
+    return _checker
+
+
+async def close_checker() -> None:
+    """Close the shared checker (called at application shutdown)"""
+    global _checker
+    if _checker is not None:
+        await _checker.close()
+        _checker = None
+
+
+async def get_checker() -> GrammarChecker:
+    # Falls back to lazy creation when used outside the app lifecycle (scripts)
+    if _checker is None:
+        return await init_checker()
+    return _checker
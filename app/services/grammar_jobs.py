@@ -0,0 +1,217 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import registry
+from app.models.grammar_job import GrammarJob, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from app.services.grammar_service import GrammarService
+
+
+class GrammarQueueFull(Exception):
+    """Raised when no more grammar jobs can be accepted right now"""
+
+
+class JobQueue:
+    """Bounded in-process worker pool for jobs stored in a table.
+
+    Job state lives in the model's table; the in-memory queue only
+    carries job ids. Workers claim a job with a conditional UPDATE, so a
+    job enqueued by more than one process still runs once. A reaper
+    re-queues jobs a crashed process left queued or running. Subclasses
+    set model and stale_seconds and implement _execute.
+    """
+
+    model = None
+    label = "jobs"
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._reserved = 0  # slots promised to submissions still committing their job row
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def stale_seconds(self) -> float:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        await self._recover()
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        self._tasks.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _room(self) -> int:
+        return self.queue.maxsize - self.queue.qsize() - self._reserved
+
+    async def _submit(self, db: AsyncSession, active: ColumnElement, new_job: Callable[[], Any]):
+        """Queue the job new_job() creates, or return the active one matching the active condition"""
+        for _ in range(3):
+            job = await self._active_job(db, active)
+            if job:
+                return job
+
+            # Take the queue slot before the row is committed, so the id always fits afterwards
+            if self._room() <= 0:
+                raise GrammarQueueFull(f"Grammar {self.label} queue is full, try again later")
+            self._reserved += 1
+            try:
+                job = new_job()
+                db.add(job)
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    # A concurrent submission won; return its job, or try
+                    # again if that one has finished in the meantime
+                    await db.rollback()
+                    continue
+                self.queue.put_nowait(job.id)
+                return job
+            finally:
+                self._reserved -= 1
+
+        raise GrammarQueueFull(f"Grammar {self.label} are being submitted concurrently, try again")
+
+    async def get_job(self, db: AsyncSession, job_id: UUID):
+        result = await db.execute(select(self.model).where(self.model.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def _active_job(self, db: AsyncSession, active: ColumnElement):
+        result = await db.execute(
+            select(self.model).where(active, self.model.status.in_([JOB_QUEUED, JOB_RUNNING]))
+        )
+        return result.scalar_one_or_none()
+
+    async def _recover(self, queued_before: Optional[datetime] = None) -> int:
+        """Re-queue jobs left behind by this or another process; returns how many were queued.
+
+        Jobs running longer than stale_seconds go back to
+        queued. Queued jobs are then put on the in-memory queue: all of
+        them at startup, only old ones (queued_before) when reaping, as
+        newer ones are still on the queue of the process that took them.
+        Running one twice is harmless, the claim lets only one through.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(self.model)
+                .where(self.model.status == JOB_RUNNING, self.model.started_at < stale_before)
+                .values(status=JOB_QUEUED, started_at=None)
+            )
+            await db.commit()
+
+            room = self._room()
+            if room <= 0:
+                return 0
+            query = select(self.model.id).where(self.model.status == JOB_QUEUED)
+            if queued_before is not None:
+                query = query.where(self.model.created_at < queued_before)
+            result = await db.execute(query.order_by(self.model.created_at).limit(room))
+            job_ids = result.scalars().all()
+            for job_id in job_ids:
+                self.queue.put_nowait(job_id)
+            return len(job_ids)
+
+    async def _reaper(self) -> None:
+        """Periodically pick up jobs of crashed workers, so their revisions don't stay blocked"""
+        while True:
+            await asyncio.sleep(settings.GRAMMAR_JOB_REAP_INTERVAL_SECONDS)
+            try:
+                stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+                requeued = await self._recover(queued_before=stale_before)
+                if requeued:
+                    print(f"♻️ Re-queued {requeued} stale grammar {self.label}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Grammar {self.label} reaper failed: {e}")
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"❌ Job {job_id} of the grammar {self.label} queue crashed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job_id: UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            # Claim the job; another worker or process may already own it
+            result = await db.execute(
+                update(self.model)
+                .where(self.model.id == job_id, self.model.status == JOB_QUEUED)
+                .values(status=JOB_RUNNING, started_at=datetime.utcnow())
+                .returning(self.model)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+            if job is None:
+                return
+
+            values = {"status": JOB_DONE}
+            try:
+                values.update(await self._execute(db, job))
+            except Exception as e:
+                await db.rollback()
+                values["status"] = JOB_FAILED
+                values["error"] = str(e) or type(e).__name__
+
+            values["finished_at"] = datetime.utcnow()
+            await db.execute(update(self.model).where(self.model.id == job_id).values(**values))
+            await db.commit()
+
+    async def _execute(self, db: AsyncSession, job) -> dict:
+        """Do the job's work; returns the columns to store with the done status"""
+        raise NotImplementedError
+
+
+class GrammarJobQueue(JobQueue):
+    """Grammar checks of single revisions, at most one active job per revision"""
+
+    model = GrammarJob
+
+    @property
+    def stale_seconds(self) -> float:
+        return settings.GRAMMAR_JOB_STALE_SECONDS
+
+    async def submit(self, db: AsyncSession, revision_id: UUID) -> GrammarJob:
+        """Queue a check for a revision, or return the job already active for it"""
+        return await self._submit(
+            db,
+            GrammarJob.revision_id == revision_id,
+            lambda: GrammarJob(revision_id=revision_id, status=JOB_QUEUED)
+        )
+
+    async def _execute(self, db: AsyncSession, job: GrammarJob) -> dict:
+        issues = await GrammarService.check_revision(db, job.revision_id)
+        return {"total_issues": len(issues)}
+
+
+grammar_jobs = GrammarJobQueue(
+    workers=settings.GRAMMAR_JOB_WORKERS,
+    max_pending=settings.GRAMMAR_JOB_QUEUE_SIZE,
+)
+
+
+def _collect_queue():
+    yield "grammar_job_queue_depth", "gauge", "Grammar jobs waiting for a worker", [
+        ("grammar_job_queue_depth", {}, grammar_jobs.queue.qsize()),
+    ]
+
+
+registry.add_collector(_collect_queue)
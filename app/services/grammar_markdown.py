@@ -0,0 +1,176 @@
+import re
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+
+FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+HORIZONTAL_RULE = re.compile(r"^ {0,3}([-*_])( *\1){2,} *$")
+TABLE_DELIMITER = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)+\|?\s*$")
+HTML_BLOCK = re.compile(r"^ {0,3}<(/?[A-Za-z][\w-]*|!--)")
+INDENTED_CODE = re.compile(r"^(?: {4}|\t)")
+LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d{1,9}[.)])\s+")
+# Block prefixes that are markup: quote markers, heading hashes, list bullets, task boxes
+BLOCK_PREFIX = re.compile(r"^ {0,3}(?:>\s?)*(?:#{1,6}\s+|\s*(?:[-*+]|\d{1,9}[.)])\s+(?:\[[ xX]\]\s+)?)?")
+HEADING_CLOSE = re.compile(r"\s+#+\s*$")
+
+INLINE_MARKUP = re.compile(
+    r"(?P<code>(?P<ticks>`+).+?(?P=ticks))"
+    r"|(?P<image>!\[[^\]]*\]\([^)]*\))"
+    r"|(?P<link>\[(?P<link_text>[^\]]+)\](?:\([^)]*\)|\[[^\]]*\]))"
+    r"|(?P<autolink><(?:https?://|mailto:)[^>]+>)"
+    r"|(?P<url>https?://[^\s)>\]]*[^\s)>\].,;:!?])"  # trailing punctuation ends the sentence
+    r"|(?P<html></?[A-Za-z][\w-]*(?:\s[^<>]*)?/?>|<!--.*?-->)"
+    r"|(?P<emphasis>\*\*|__|~~|(?<!\w)[*_](?=\S)|(?<=\S)[*_](?!\w))"
+)
+
+# Stands in for inline code and URLs, so the sentence around them still parses
+PLACEHOLDER = "X"
+
+
+class ProseText:
+    """Prose extracted from markdown, with a map back to the source.
+
+    ``text`` keeps every line break of the source (so paragraphs stay
+    paragraphs) but drops code blocks, tables, HTML, URLs and markup
+    characters. Runs record which source span each piece came from.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts: List[str] = []
+        self.size = 0
+        # (prose start, prose length, source start, source length, is placeholder)
+        self.runs: List[Tuple[int, int, int, int, bool]] = []
+        self._starts: List[int] = []
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def keep(self, start: int, end: int) -> None:
+        """Copy source[start:end] into the prose text"""
+        if end <= start:
+            return
+        last = self.runs[-1] if self.runs else None
+        if last and not last[4] and last[2] + last[3] == start and last[0] + last[1] == self.size:
+            # Extends the previous copied run
+            self.runs[-1] = (last[0], last[1] + end - start, last[2], last[3] + end - start, False)
+        else:
+            self._add_run(end - start, start, end - start, False)
+        self.parts.append(self.source[start:end])
+        self.size += end - start
+
+    def substitute(self, start: int, end: int, placeholder: str = PLACEHOLDER) -> None:
+        """Replace source[start:end] with placeholder text"""
+        self._add_run(len(placeholder), start, end - start, True)
+        self.parts.append(placeholder)
+        self.size += len(placeholder)
+
+    def _add_run(self, length: int, source_start: int, source_length: int, placeholder: bool) -> None:
+        self.runs.append((self.size, length, source_start, source_length, placeholder))
+        self._starts.append(self.size)
+
+    def _run_index(self, offset: int) -> int:
+        return bisect_right(self._starts, offset) - 1
+
+    def to_source(self, offset: int, length: int) -> Optional[Tuple[int, int]]:
+        """Map a prose span to (source offset, source length).
+
+        Returns None for spans touching placeholder text, since a fix there
+        would rewrite code or a URL.
+        """
+        first = self._run_index(offset)
+        last = self._run_index(offset + max(length, 1) - 1)
+        if first < 0:
+            return None
+        if any(run[4] for run in self.runs[first:last + 1]):
+            return None
+
+        start = self.runs[first][2] + (offset - self.runs[first][0])
+        end = self.runs[last][2] + (offset + length - self.runs[last][0])
+        return start, end - start
+
+
+def _keep_inline(prose: ProseText, source: str, start: int, end: int) -> None:
+    """Copy a line of prose, dropping or substituting inline markup"""
+    position = start
+    for markup in INLINE_MARKUP.finditer(source, start, end):
+        prose.keep(position, markup.start())
+        if markup.group("link"):
+            prose.keep(markup.start("link_text"), markup.end("link_text"))
+        elif markup.group("code") or markup.group("autolink") or markup.group("url"):
+            prose.substitute(markup.start(), markup.end())
+        # images, inline html and emphasis markers are dropped
+        position = markup.end()
+    prose.keep(position, end)
+
+
+def extract_prose(markdown_text: str) -> ProseText:
+    """Split markdown into prose (kept) and markup (dropped) segments"""
+    prose = ProseText(markdown_text)
+    lines = markdown_text.splitlines(keepends=True)
+
+    fence = None
+    in_table = False
+    in_list = False
+    previous_blank = True
+    previous_code = False
+    offset = 0
+
+    for index, line in enumerate(lines):
+        line_start = offset
+        offset += len(line)
+        body = line.rstrip("\r\n")
+        body_end = line_start + len(body)
+        blank = not body.strip()
+        # Line breaks are always kept so paragraph boundaries survive
+        newline = (body_end, offset)
+
+        if fence:
+            if body.strip().startswith(fence):
+                fence = None
+            prose.keep(*newline)
+            continue
+
+        fence_match = FENCE.match(body)
+        if fence_match:
+            fence = fence_match.group(1)[0] * len(fence_match.group(1))
+            prose.keep(*newline)
+            continue
+
+        if blank:
+            in_table = False
+            previous_blank = True
+            prose.keep(*newline)
+            continue
+
+        next_line = lines[index + 1] if index + 1 < len(lines) else ""
+        if in_table or ("|" in body and TABLE_DELIMITER.match(next_line)):
+            in_table = True
+            prose.keep(*newline)
+            continue
+
+        is_code = INDENTED_CODE.match(body) and (previous_code or (previous_blank and not in_list))
+        if is_code or HORIZONTAL_RULE.match(body) or HTML_BLOCK.match(body):
+            previous_code = bool(is_code)
+            previous_blank = False
+            prose.keep(*newline)
+            continue
+
+        if LIST_ITEM.match(body):
+            in_list = True
+        elif previous_blank and not INDENTED_CODE.match(body):
+            in_list = False
+        previous_blank = False
+        previous_code = False
+
+        text_start = line_start + BLOCK_PREFIX.match(body).end()
+        text_end = body_end
+        closing = HEADING_CLOSE.search(body)
+        if closing and body.lstrip(" >").startswith("#"):
+            text_end = line_start + closing.start()
+
+        _keep_inline(prose, markdown_text, text_start, text_end)
+        prose.keep(*newline)
+
+    return prose
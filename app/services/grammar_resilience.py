@@ -0,0 +1,306 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import List
+
+from app.core.config import settings
+from app.core.metrics import grammar_backend_duration
+from app.core.profiling import profile_span
+from app.services.grammar_checker import GrammarChecker, GrammarCheckError
+
+
+class GrammarBackendUnavailable(GrammarCheckError):
+    """The backend is failing or too slow; the check was not (fully) attempted"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message, status_code=503)
+        self.retry_after = retry_after
+
+
+class LatencyHistogram:
+    """Cumulative latency buckets plus a window of recent samples for quantiles"""
+
+    BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, window: int = 500):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        index = 0
+        while index < len(self.BUCKETS) and seconds > self.BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.BUCKETS + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "p50_seconds": round(self.quantile(0.5), 6),
+            "p95_seconds": round(self.quantile(0.95), 6),
+            "p99_seconds": round(self.quantile(0.99), 6),
+            "buckets": buckets,
+        }
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and fails fast until reset_seconds pass.
+
+    After that a single probe call is let through (half-open); its outcome
+    closes the breaker again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return self.state != self.OPEN
+
+    def release_probe(self) -> None:
+        """Give up a half-open probe without an outcome (e.g. cancelled)"""
+        self._probing = False
+
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and self.retry_after() > 0
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_seconds": self.reset_seconds,
+            "retry_after_seconds": round(self.retry_after(), 3),
+            "times_opened": self.times_opened,
+        }
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, GrammarBackendUnavailable):
+        return False
+    if isinstance(error, GrammarCheckError):
+        return error.status_code == 429 or (error.status_code or 0) >= 500
+    import httpx
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+
+def is_client_error(error: Exception) -> bool:
+    """A 4xx (other than 429) answer: the request was bad, the backend is fine"""
+    if isinstance(error, GrammarBackendUnavailable) or not isinstance(error, GrammarCheckError):
+        return False
+    return error.status_code is not None and 400 <= error.status_code < 500 and error.status_code != 429
+
+
+class ResilientChecker(GrammarChecker):
+    """Wraps a checker with deadlines, jittered retries, hedging and a breaker.
+
+    - every attempt gets at most attempt_timeout, the whole call total_timeout
+    - 429/5xx responses, timeouts and transport errors are retried with
+      exponential backoff and full jitter while the total budget allows
+    - with hedging on, a second identical request is started when the
+      first is slower than the recent p95 latency; the first answer wins
+    - consecutive failures open the circuit breaker, and calls then fail
+      immediately with GrammarBackendUnavailable
+    """
+
+    def __init__(self, inner: GrammarChecker, attempt_timeout: float, total_timeout: float,
+                 max_retries: int, retry_backoff: float, hedge: bool, hedge_min_delay: float,
+                 breaker: CircuitBreaker):
+        self.inner = inner
+        self.name = inner.name
+        self.attempt_timeout = attempt_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker
+        self.latency = LatencyHistogram()
+        self.counters = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0,
+                         "failures": 0, "rejected": 0}
+
+    @classmethod
+    def wrap(cls, inner: GrammarChecker) -> "ResilientChecker":
+        return cls(
+            inner,
+            attempt_timeout=settings.GRAMMAR_ATTEMPT_TIMEOUT,
+            total_timeout=settings.GRAMMAR_TOTAL_TIMEOUT,
+            max_retries=settings.GRAMMAR_MAX_RETRIES,
+            retry_backoff=settings.GRAMMAR_RETRY_BACKOFF,
+            hedge=settings.GRAMMAR_HEDGE_ENABLED,
+            hedge_min_delay=settings.GRAMMAR_HEDGE_MIN_DELAY,
+            breaker=CircuitBreaker(settings.GRAMMAR_BREAKER_FAILURES, settings.GRAMMAR_BREAKER_RESET_SECONDS),
+        )
+
+    @property
+    def ruleset(self) -> str:
+        return self.inner.ruleset
+
+    def is_available(self) -> bool:
+        return not self.breaker.is_open()
+
+    def retry_after(self) -> float:
+        return self.breaker.retry_after()
+
+    async def check(self, text: str, language: str) -> List[dict]:
+        self.counters["calls"] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.total_timeout
+        attempt = 0
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise GrammarBackendUnavailable("Grammar backend deadline exceeded")
+
+            if not self.breaker.allow():
+                self.counters["rejected"] += 1
+                raise GrammarBackendUnavailable(
+                    "Grammar backend is unavailable (circuit open)",
+                    retry_after=self.breaker.retry_after()
+                )
+
+            try:
+                matches = await asyncio.wait_for(
+                    self._attempt(text, language),
+                    timeout=min(self.attempt_timeout, remaining)
+                )
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if is_client_error(e):
+                    # a 4xx means the request was bad, not that the backend is unhealthy
+                    self.breaker.record_success()
+                    raise
+                self.counters["failures"] += 1
+                self.breaker.record_failure()
+                if not is_retryable(e):
+                    # unusable answers (e.g. a proxy's HTML page) and bugs
+                    # count against the backend but are not worth retrying
+                    raise
+
+                backoff = random.uniform(0, self.retry_backoff * (2 ** attempt))
+                if attempt >= self.max_retries or loop.time() + backoff >= deadline:
+                    if isinstance(e, GrammarCheckError):
+                        raise
+                    raise GrammarBackendUnavailable(
+                        f"Grammar backend failed: {type(e).__name__}"
+                    ) from e
+
+                self.counters["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            return matches
+
+    async def _attempt(self, text: str, language: str) -> List[dict]:
+        if not self.hedge or self.latency.count < 20:
+            return await self._timed_check(text, language)
+
+        # Hedge: if the first request is slower than the recent p95, send a
+        # second one and take whichever answers first
+        hedge_delay = max(self.hedge_min_delay, self.latency.quantile(0.95))
+        tasks = [asyncio.create_task(self._timed_check(text, language))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                self.counters["hedges"] += 1
+                tasks.append(asyncio.create_task(self._timed_check(text, language)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # every request failed: surface the first one's error
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _timed_check(self, text: str, language: str) -> List[dict]:
+        self.counters["attempts"] += 1
+        start = time.perf_counter()
+        try:
+            with profile_span("grammar.backend", f"{self.inner.name}, {len(text)} chars"):
+                matches = await self.inner.check(text, language)
+        except asyncio.CancelledError:
+            # lost a hedge race or hit the attempt timeout
+            grammar_backend_duration.labels(self.name, "cancelled").observe(time.perf_counter() - start)
+            raise
+        except Exception:
+            grammar_backend_duration.labels(self.name, "error").observe(time.perf_counter() - start)
+            raise
+        elapsed = time.perf_counter() - start
+        self.latency.observe(elapsed)
+        grammar_backend_duration.labels(self.name, "ok").observe(elapsed)
+        return matches
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": self.inner.name,
+            "breaker": self.breaker.snapshot(),
+            "latency": self.latency.snapshot(),
+            "counters": dict(self.counters),
+            "hedging": self.hedge,
+        }
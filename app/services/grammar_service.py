@@ -1,17 +1,101 @@
-import httpx
-import json
-from typing import List
+import asyncio
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, func, insert, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from uuid import UUID
 
+from app.core.config import settings
+from app.core.fast_json import field_names, projection
 from app.models.grammar_issue import GrammarIssue
 from app.models.note_revision import NoteRevision
+from app.services.grammar_cache import grammar_cache, cache_key
+from app.services.grammar_checker import get_checker
+from app.services.grammar_markdown import extract_prose
+from app.services.grammar_text import split_segments, pack_chunks
+from app.services.text_edits import TextEdit, apply_edits, rebase_edits
+from app.schemas.grammar import GrammarIssueOut
+
+ISSUE_FIELDS = field_names(GrammarIssueOut)
+# Rows stored before replacements became JSONB may hold NULL; the response always has a list
+ISSUE_COLUMNS = [
+    func.coalesce(column, literal_column("'[]'::jsonb")).label(name) if name == "replacements" else column
+    for name, column in zip(ISSUE_FIELDS, projection(GrammarIssueOut, GrammarIssue))
+]
+
+
+class FixResult(NamedTuple):
+    title: str
+    content: str
+    applied_ids: List[UUID]
+    conflicting_ids: List[UUID]
+
+    @property
+    def text(self) -> str:
+        """Title and content combined the way issue offsets are computed"""
+        return f"{self.title}\n\n{self.content}"
 
 
 class GrammarService:
 
-    LANGUAGETOOL_API = "https://api.languagetool.org/v2/check"
+    @staticmethod
+    async def check_text(text: str) -> List[dict]:
+        """Check text in size-bounded chunks, concurrently.
+
+        With GRAMMAR_MARKDOWN_AWARE only the prose is sent; code, tables,
+        HTML and URLs are left out. Paragraphs already in the result cache
+        are not sent to the backend. Returned match offsets are positions
+        in the original text.
+        """
+        checker = await get_checker()
+        language = settings.GRAMMAR_LANGUAGE
+        prose = extract_prose(text) if settings.GRAMMAR_MARKDOWN_AWARE else None
+        segments = split_segments(prose.text if prose else text, settings.GRAMMAR_CHUNK_SIZE)
+        keys = [cache_key(language, checker.ruleset, segment.text) for segment in segments]
+
+        # Relative matches per segment, from the cache or from the backend
+        unique = {}
+        for segment, key in zip(segments, keys):
+            unique.setdefault(key, segment)
+        segment_matches = {}
+        to_check = {}
+        for (key, segment), cached in zip(unique.items(), await grammar_cache.get_many(list(unique))):
+            if cached is None:
+                to_check[key] = segment
+            else:
+                segment_matches[key] = cached
+
+        chunks = pack_chunks(list(to_check.values()), settings.GRAMMAR_CHUNK_SIZE)
+        semaphore = asyncio.Semaphore(settings.GRAMMAR_MAX_CONCURRENCY)
+
+        async def check_chunk(chunk):
+            async with semaphore:
+                return await checker.check(chunk.text, language)
+
+        results = await asyncio.gather(*(check_chunk(chunk) for chunk in chunks))
+
+        checked_keys = iter(to_check)
+        for chunk, chunk_matches in zip(chunks, results):
+            for relative_matches in chunk.split_matches(chunk_matches):
+                segment_matches[next(checked_keys)] = relative_matches
+        await grammar_cache.set_many({key: segment_matches[key] for key in to_check})
+
+        # Shift the per-paragraph matches to their place in this text
+        matches = []
+        for segment, key in zip(segments, keys):
+            for relative_match in segment_matches[key]:
+                match = dict(relative_match)
+                match["offset"] = segment.offset + relative_match["offset"]
+                if prose:
+                    # Back from prose positions to the original markdown
+                    span = prose.to_source(match["offset"], match.get("length", 0))
+                    if span is None:
+                        continue
+                    match["offset"], match["length"] = span
+                matches.append(match)
+
+        matches.sort(key=lambda m: m["offset"])
+        return matches
 
     @staticmethod
     async def check_revision(db: AsyncSession, revision_id: UUID) -> List[GrammarIssue]:
@@ -28,63 +112,62 @@ class GrammarService:
         # Combine title and content for checking
         text_to_check = f"{revision.title}\n\n{revision.content}"
 
-        # Clear existing issues for this revision
-        await db.execute(
-            select(GrammarIssue).where(GrammarIssue.revision_id == revision_id)
-        )
-        existing_issues = (await db.execute(
-            select(GrammarIssue).where(GrammarIssue.revision_id == revision_id)
-        )).scalars().all()
-
-        for issue in existing_issues:
-            await db.delete(issue)
-
-        # Call LanguageTool API
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                GrammarService.LANGUAGETOOL_API,
-                data={
-                    "text": text_to_check,
-                    "language": "en-US",
-                }
-            )
-
-            if response.status_code != 200:
-                raise Exception(f"LanguageTool API error: {response.status_code}")
-
-            data = response.json()
-
-        # Store issues in database
-        grammar_issues = []
-        for match in data.get("matches", []):
-            # Extract replacements
-            replacements = [r["value"] for r in match.get("replacements", [])[:5]]  # Limit to 5 suggestions
-
-            grammar_issue = GrammarIssue(
-                revision_id=revision_id,
-                message=match.get("message", ""),
-                short_message=match.get("shortMessage"),
-                offset=match.get("offset", 0),
-                length=match.get("length", 0),
-                context=match.get("context", {}).get("text"),
-                replacements=json.dumps(replacements),  # Store as JSON string
-                issue_type=match.get("rule", {}).get("issueType"),
-                rule_id=match.get("rule", {}).get("id"),
-                category=match.get("rule", {}).get("category", {}).get("name"),
-                is_applied=False
-            )
+        # End the read transaction, so no pooled connection is held while
+        # waiting on the grammar backend
+        await db.commit()
 
-            db.add(grammar_issue)
-            grammar_issues.append(grammar_issue)
+        # Call the configured grammar backend (shared pooled client)
+        matches = await GrammarService.check_text(text_to_check)
 
+        # Replace the stored issues in bulk
+        grammar_issues = await GrammarService.store_issues(db, {revision_id: matches})
         await db.commit()
 
-        # Refresh to get IDs
-        for issue in grammar_issues:
-            await db.refresh(issue)
-
         return grammar_issues
 
+    @staticmethod
+    def issue_row(revision_id: UUID, match: dict) -> dict:
+        """Column values for one GrammarIssue built from a backend match"""
+        rule = match.get("rule", {})
+        return {
+            "revision_id": revision_id,
+            "message": match.get("message", ""),
+            "short_message": match.get("shortMessage"),
+            "offset": match.get("offset", 0),
+            "length": match.get("length", 0),
+            "context": match.get("context", {}).get("text"),
+            "replacements": [r["value"] for r in match.get("replacements", [])[:5]],  # Limit to 5 suggestions
+            "issue_type": rule.get("issueType"),
+            "rule_id": rule.get("id"),
+            "category": rule.get("category", {}).get("name"),
+            "is_applied": False,
+        }
+
+    @staticmethod
+    async def store_issues(db: AsyncSession, matches_by_revision: Dict[UUID, List[dict]]) -> List[GrammarIssue]:
+        """Replace the stored issues of the given revisions.
+
+        One DELETE for all revisions and one multi-row INSERT ... RETURNING
+        for the new issues. The caller commits.
+        """
+        await db.execute(
+            delete(GrammarIssue).where(GrammarIssue.revision_id.in_(list(matches_by_revision)))
+        )
+
+        rows = [
+            GrammarService.issue_row(revision_id, match)
+            for revision_id, matches in matches_by_revision.items()
+            for match in matches
+        ]
+        if not rows:
+            return []
+
+        result = await db.scalars(
+            insert(GrammarIssue).returning(GrammarIssue, sort_by_parameter_order=True),
+            rows
+        )
+        return result.all()
+
     @staticmethod
     async def get_issues(db: AsyncSession, revision_id: UUID) -> List[GrammarIssue]:
         """Get all grammar issues for a revision"""
@@ -95,12 +178,35 @@ class GrammarService:
         )
         return result.scalars().all()
 
+    @staticmethod
+    async def get_issue_rows(db: AsyncSession, revision_id: UUID) -> List[dict]:
+        """Issues of a revision as GrammarIssueOut-shaped dicts, straight from a column query"""
+        result = await db.execute(
+            select(*ISSUE_COLUMNS)
+            .where(GrammarIssue.revision_id == revision_id)
+            .order_by(GrammarIssue.offset)
+        )
+        return [dict(zip(ISSUE_FIELDS, row)) for row in result.all()]
+
     @staticmethod
     async def apply_fixes(
             db: AsyncSession,
             revision_id: UUID,
-            issue_ids: List[UUID]
-    ) -> str:
+            issue_ids: List[UUID],
+            commit: bool = True,
+            onto: Optional[Tuple[str, str]] = None
+    ) -> "FixResult":
+        """Apply the first suggestion of each selected issue in a single pass.
+
+        Issues whose range overlaps an earlier selected issue (or spans the
+        title/content separator) are not applied and are reported as
+        conflicts. Pass commit=False to leave the transaction open, e.g. to
+        save the result as a new note version in the same transaction.
+
+        onto=(title, content) applies the fixes to that newer text of the
+        note instead of the revision's: each fix moves with the text it
+        corrects, and fixes whose text has been changed are conflicts.
+        """
 
         # Fetch revision
         result = await db.execute(
@@ -118,31 +224,45 @@ class GrammarService:
                 GrammarIssue.revision_id == revision_id,
                 GrammarIssue.id.in_(issue_ids)
             )
-            .order_by(GrammarIssue.offset.desc())  # Apply from end to start
         )
-        issues = result.scalars().all()
+        issues = {issue.id: issue for issue in result.scalars().all()}
 
-        # Combine title and content
-        content = f"{revision.title}\n\n{revision.content}"
+        # Offsets are into "title\n\ncontent"; split the edits per part
+        title = revision.title
+        content = revision.content
+        content_start = len(title) + 2
+        title_edits = []
+        content_edits = []
+        conflicts = []
+        for issue in issues.values():
+            if not issue.replacements:
+                continue
+            # Use the first suggestion
+            replacement = issue.replacements[0]
+            end = issue.offset + issue.length
+            if end <= len(title):
+                title_edits.append(TextEdit(issue.offset, issue.length, replacement, issue.id))
+            elif issue.offset >= content_start:
+                content_edits.append(TextEdit(issue.offset - content_start, issue.length, replacement, issue.id))
+            else:
+                conflicts.append(issue.id)
 
-        # Apply fixes from end to start (to preserve offsets)
-        applied_count = 0
-        for issue in issues:
-            replacements = json.loads(issue.replacements) if issue.replacements else []
+        if onto is not None:
+            title_edits, moved_title_conflicts = rebase_edits(title, onto[0], title_edits)
+            content_edits, moved_content_conflicts = rebase_edits(content, onto[1], content_edits)
+            conflicts += [edit.key for edit in moved_title_conflicts + moved_content_conflicts]
+            title, content = onto
 
-            if replacements:
-                # Use the first suggestion
-                replacement = replacements[0]
+        new_title, applied_title, title_conflicts = apply_edits(title, title_edits)
+        new_content, applied_content, content_conflicts = apply_edits(content, content_edits)
+        conflicts += [edit.key for edit in title_conflicts + content_conflicts]
 
-                # Apply the fix
-                start = issue.offset
-                end = issue.offset + issue.length
-                content = content[:start] + replacement + content[end:]
+        # Mark as applied
+        applied = [edit.key for edit in applied_title + applied_content]
+        for issue_id in applied:
+            issues[issue_id].is_applied = True
 
-                # Mark as applied
-                issue.is_applied = True
-                applied_count += 1
-
-        await db.commit()
+        if commit:
+            await db.commit()
 
-        return content
\ No newline at end of file
+        return FixResult(new_title, new_content, applied, conflicts)
@@ -0,0 +1,150 @@
+import re
+from bisect import bisect_right
+from typing import List, NamedTuple
+
+
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+PARAGRAPH_JOINER = "\n\n"
+SENTENCE_JOINER = " "
+
+
+class TextSegment(NamedTuple):
+    """A piece of the checked text and its position in the original string"""
+    offset: int
+    text: str
+    paragraph: int  # segments of the same paragraph are joined with a space
+
+
+class Chunk:
+    """Several segments packed into one backend request.
+
+    Keeps where each segment starts inside the packed text, so match
+    offsets returned by the backend can be mapped back to their segment.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.segments: List[TextSegment] = []
+        self.local_offsets: List[int] = []
+        self.size = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def joiner_for(self, segment: TextSegment) -> str:
+        if not self.segments:
+            return ""
+        if self.segments[-1].paragraph == segment.paragraph:
+            return SENTENCE_JOINER
+        return PARAGRAPH_JOINER
+
+    def add(self, segment: TextSegment) -> None:
+        joiner = self.joiner_for(segment)
+        self.parts.append(joiner)
+        self.size += len(joiner)
+        self.local_offsets.append(self.size)
+        self.segments.append(segment)
+        self.parts.append(segment.text)
+        self.size += len(segment.text)
+
+    def locate(self, local_offset: int) -> int:
+        """Index of the segment containing local_offset, or -1 (joiner text)"""
+        index = bisect_right(self.local_offsets, local_offset) - 1
+        if index < 0:
+            return -1
+        if local_offset >= self.local_offsets[index] + len(self.segments[index].text):
+            return -1
+        return index
+
+    def split_matches(self, matches: List[dict]) -> List[List[dict]]:
+        """Distribute backend matches over the chunk's segments.
+
+        Offsets in the returned matches are relative to the start of their
+        segment; matches that start in joiner text are dropped.
+        """
+        per_segment = [[] for _ in self.segments]
+        for match in matches:
+            local_offset = match.get("offset", 0)
+            index = self.locate(local_offset)
+            if index < 0:
+                continue
+
+            relative = local_offset - self.local_offsets[index]
+            # Never let a match run past its own segment into joiner text
+            length = min(match.get("length", 0), len(self.segments[index].text) - relative)
+
+            relative_match = dict(match)
+            relative_match["offset"] = relative
+            relative_match["length"] = length
+            per_segment[index].append(relative_match)
+        return per_segment
+
+
+def _split_long(text: str, offset: int, max_chars: int) -> List[tuple]:
+    """Split text that is longer than max_chars at whitespace"""
+    pieces = []
+    start = 0
+    while len(text) - start > max_chars:
+        cut = text.rfind(" ", start, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        pieces.append((offset + start, text[start:cut]))
+        start = cut
+        while start < len(text) and text[start] == " ":
+            start += 1
+    if start < len(text):
+        pieces.append((offset + start, text[start:]))
+    return pieces
+
+
+def split_segments(text: str, max_chars: int) -> List[TextSegment]:
+    """Split text at paragraph, then sentence boundaries into pieces <= max_chars"""
+    segments = []
+    paragraph_start = 0
+    breaks = [(m.start(), m.end()) for m in PARAGRAPH_BREAK.finditer(text)]
+    breaks.append((len(text), len(text)))
+
+    for paragraph_index, (break_start, break_end) in enumerate(breaks):
+        paragraph = text[paragraph_start:break_start]
+        paragraph_offset = paragraph_start
+        paragraph_start = break_end
+
+        if not paragraph.strip():
+            continue
+
+        if len(paragraph) <= max_chars:
+            segments.append(TextSegment(paragraph_offset, paragraph, paragraph_index))
+            continue
+
+        # Long paragraph: fall back to sentences, and hard splits for run-ons
+        sentence_start = 0
+        sentence_bounds = [(m.start(), m.end()) for m in SENTENCE_END.finditer(paragraph)]
+        sentence_bounds.append((len(paragraph), len(paragraph)))
+        for end, next_start in sentence_bounds:
+            sentence = paragraph[sentence_start:end]
+            sentence_offset = paragraph_offset + sentence_start
+            sentence_start = next_start
+            if not sentence:
+                continue
+            for piece_offset, piece in _split_long(sentence, sentence_offset, max_chars):
+                segments.append(TextSegment(piece_offset, piece, paragraph_index))
+
+    return segments
+
+
+def pack_chunks(segments: List[TextSegment], max_chars: int) -> List[Chunk]:
+    """Greedily pack consecutive segments into chunks of at most max_chars"""
+    chunks = []
+    current = Chunk()
+    for segment in segments:
+        added = len(current.joiner_for(segment)) + len(segment.text)
+        if current.segments and current.size + added > max_chars:
+            chunks.append(current)
+            current = Chunk()
+        current.add(segment)
+    if current.segments:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, List
+
+
+class HtmlSanitizer:
+    """Strips rendered HTML down to an allow-list of tags, attributes and URL schemes.
+
+    Disallowed tags are removed but their text is kept (escaped), comments
+    are dropped, and href/src values with other schemes are removed.
+    Backends take the same policy and must produce equivalent output; see
+    tests/test_html_sanitizer.py.
+    """
+
+    name = ""
+
+    def __init__(self, tags: Iterable[str], attributes: Dict[str, List[str]], protocols: Iterable[str]):
+        self.tags = list(tags)
+        self.attributes = {tag: list(names) for tag, names in attributes.items()}
+        self.protocols = list(protocols)
+
+    def clean(self, html: str) -> str:
+        raise NotImplementedError
+
+
+class BleachSanitizer(HtmlSanitizer):
+    """bleach (html5lib tokenizer, pure Python)"""
+
+    name = "bleach"
+
+    def clean(self, html: str) -> str:
+        import bleach
+
+        return bleach.clean(
+            html,
+            tags=self.tags,
+            attributes=self.attributes,
+            protocols=self.protocols,
+            strip=True
+        )
+
+
+class Nh3Sanitizer(HtmlSanitizer):
+    """nh3, bindings to the Rust ammonia crate (html5ever parser)"""
+
+    name = "nh3"
+
+    def __init__(self, tags, attributes, protocols):
+        super().__init__(tags, attributes, protocols)
+        self._cleaner = None
+
+    def clean(self, html: str) -> str:
+        if self._cleaner is None:
+            try:
+                import nh3
+            except ImportError:
+                raise RuntimeError("HTML_SANITIZER=nh3 needs the nh3 package (pip install nh3)")
+            self._cleaner = nh3.Cleaner(
+                tags=set(self.tags),
+                attributes={tag: set(names) for tag, names in self.attributes.items()},
+                url_schemes=set(self.protocols),
+                link_rel=None,  # rel is an allowed attribute, kept as written like bleach does
+                clean_content_tags=set(),  # like bleach: keep the text of stripped <script>/<style>, escaped
+                strip_comments=True
+            )
+        return self._cleaner.clean(html)
+
+
+SANITIZERS = {sanitizer.name: sanitizer for sanitizer in (BleachSanitizer, Nh3Sanitizer)}
+
+
+def create_sanitizer(name: str, tags, attributes, protocols) -> HtmlSanitizer:
+    if name not in SANITIZERS:
+        raise ValueError(f"Unknown HTML_SANITIZER {name!r}, expected one of {', '.join(SANITIZERS)}")
+    return SANITIZERS[name](tags, attributes, protocols)
@@ -1,7 +1,17 @@
-import markdown
-import bleach
 import hashlib
+import time
 from typing import Tuple
+from uuid import UUID
+
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.metrics import register_cache, render_duration, render_size
+from app.core.profiling import profile_span
+from app.services.html_sanitizer import create_sanitizer
+
+# Rendered HTML per note, shared by all workers; invalidated on note writes
+render_cache = Cache("render", settings.RENDER_CACHE_TTL_SECONDS)
+register_cache("render", render_cache.stats)
 
 
 class MarkdownService:
@@ -22,6 +32,8 @@ class MarkdownService:
         'span': ['class'],
     }
 
+    ALLOWED_PROTOCOLS = ['http', 'https', 'mailto']  # for href/src
+
     MARKDOWN_EXTENSIONS = [
         'extra',  # Tables, fenced code blocks, etc.
         'codehilite',  # Syntax highlighting
@@ -32,22 +44,24 @@ class MarkdownService:
 
     @staticmethod
     def render_to_html(markdown_text: str) -> str:
+        # Imported on first render (or by warm_up) to keep app startup fast
+        import markdown
 
         # Convert Markdown to HTML
-        html = markdown.markdown(
-            markdown_text,
-            extensions=MarkdownService.MARKDOWN_EXTENSIONS,
-            output_format='html5'
-        )
+        with profile_span("render.markdown", f"{len(markdown_text)} chars"):
+            html = markdown.markdown(
+                markdown_text,
+                extensions=MarkdownService.MARKDOWN_EXTENSIONS,
+                output_format='html5'
+            )
 
-        sanitized_html = bleach.clean(
-            html,
-            tags=MarkdownService.ALLOWED_TAGS,
-            attributes=MarkdownService.ALLOWED_ATTRIBUTES,
-            strip=True
-        )
+        with profile_span("render.sanitize", html_sanitizer.name):
+            return html_sanitizer.clean(html)
 
-        return sanitized_html
+    @staticmethod
+    def warm_up() -> None:
+        """Import markdown/pygments and the sanitizer and load the extensions ahead of the first request"""
+        MarkdownService.render_to_html("# warm up\n\n```python\nprint('hi')\n```\n\n| a |\n|---|\n| b |")
 
     @staticmethod
     def generate_etag(content: str) -> str:
@@ -58,6 +72,40 @@ class MarkdownService:
     @staticmethod
     def render_with_etag(markdown_text: str) -> Tuple[str, str]:
 
+        start = time.perf_counter()
         html = MarkdownService.render_to_html(markdown_text)
+        render_duration.observe(time.perf_counter() - start)
+        render_size.observe(len(html.encode('utf-8')))
         etag = MarkdownService.generate_etag(html)
         return html, etag
+
+    @staticmethod
+    async def render_note(note_id: UUID, markdown_text: str) -> Tuple[str, str]:
+        """render_with_etag through the shared render cache.
+
+        Entries carry the hash of the markdown they were rendered from, so
+        a stale entry is never served even if an invalidation was missed.
+        """
+        source_hash = hashlib.sha256(markdown_text.encode('utf-8')).hexdigest()
+        cached = await render_cache.get(str(note_id))
+        if cached is not None:
+            cached_hash, etag, html = cached.decode('utf-8').split("\n", 2)
+            if cached_hash == source_hash:
+                return html, etag
+
+        html, etag = MarkdownService.render_with_etag(markdown_text)
+        await render_cache.set(str(note_id), f"{source_hash}\n{etag}\n{html}".encode('utf-8'))
+        return html, etag
+
+    @staticmethod
+    async def invalidate(*note_ids: UUID) -> None:
+        await render_cache.delete(*(str(note_id) for note_id in note_ids))
+
+
+# HTML_SANITIZER backend with the policy above
+html_sanitizer = create_sanitizer(
+    settings.HTML_SANITIZER,
+    MarkdownService.ALLOWED_TAGS,
+    MarkdownService.ALLOWED_ATTRIBUTES,
+    MarkdownService.ALLOWED_PROTOCOLS,
+)
@@ -0,0 +1,201 @@
+import uuid
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import String, bindparam, delete, func, insert, literal, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.note import Note, note_change_seq, owner_lock
+from app.models.note_revision import NoteRevision
+from app.models.tags import note_tags
+from app.schemas.note import BulkNoteOp, BulkNoteResult
+from app.services.note_events import after_notes_write
+from app.services.note_service import resolve_tags
+
+notes = Note.__table__
+revisions = NoteRevision.__table__
+
+Change = Tuple[UUID, int, str]  # (note_id, change_seq, kind) for after_notes_write
+
+
+def chunks(operations: List[BulkNoteOp], size: int) -> Iterable[List[Tuple[int, BulkNoteOp]]]:
+    """Consecutive (index, op) runs of at most size, cut where a note id repeats.
+
+    Within a chunk each note is touched once, so the chunk's creates,
+    updates and deletes can each go out as one batched statement.
+    """
+    chunk, ids = [], set()
+    for index, op in enumerate(operations):
+        if len(chunk) >= size or (op.id is not None and op.id in ids):
+            yield chunk
+            chunk, ids = [], set()
+        chunk.append((index, op))
+        if op.id is not None:
+            ids.add(op.id)
+    if chunk:
+        yield chunk
+
+
+def _invalid(op: BulkNoteOp):
+    if op.op == "create":
+        if op.title is None:
+            return "title is required to create a note"
+        if op.id is not None:
+            return "ids of new notes are assigned by the server"
+    elif op.id is None:
+        return f"id is required to {op.op} a note"
+    return None
+
+
+async def apply_chunk(db: AsyncSession, owner_id: UUID,
+                      chunk: List[Tuple[int, BulkNoteOp]]) -> Tuple[Dict[int, BulkNoteResult], List[Change]]:
+    """Write one chunk in the current transaction with a fixed number of statements. The caller commits."""
+    results: Dict[int, BulkNoteResult] = {}
+    changes: List[Change] = []
+
+    valid = []
+    for index, op in chunk:
+        error = _invalid(op)
+        if error:
+            results[index] = BulkNoteResult(index=index, op=op.op, status=422, id=op.id, error=error)
+        else:
+            valid.append((index, op))
+
+    # Core statements skip the before_flush hook, so take the owner's change lock here
+    await db.execute(owner_lock(owner_id))
+    tags = await resolve_tags(db, (name for _, op in valid if op.op != "delete" for name in op.tags))
+
+    targets = [op.id for _, op in valid if op.op != "create"]
+    live = set()
+    if targets:
+        result = await db.execute(
+            select(Note.id).where(Note.id.in_(targets), Note.owner_id == owner_id, Note.is_deleted == False)
+        )
+        live = set(result.scalars())
+
+    creates, updates, deletes = [], [], []
+    for index, op in valid:
+        if op.op == "create":
+            creates.append((index, op))
+        elif op.id not in live:
+            results[index] = BulkNoteResult(index=index, op=op.op, status=404, id=op.id, error="Note not found")
+        else:
+            (updates if op.op == "update" else deletes).append((index, op))
+
+    links = []
+    if creates:
+        rows = [{"id": uuid.uuid4(), "title": op.title, "content": op.content, "owner_id": owner_id}
+                for _, op in creates]
+        result = await db.execute(
+            insert(notes).returning(notes.c.id, notes.c.change_seq, sort_by_parameter_order=True), rows
+        )
+        for (index, op), (note_id, change_seq) in zip(creates, result.all()):
+            results[index] = BulkNoteResult(index=index, op=op.op, status=201, id=note_id, change_seq=change_seq)
+            changes.append((note_id, change_seq, "created"))
+            links.extend({"note_id": note_id, "tag_id": tags[name].id} for name in dict.fromkeys(op.tags))
+
+    if updates:
+        ids = [op.id for _, op in updates]
+        # the current state becomes a revision, copied in SQL (bodies stay compressed as stored)
+        await db.execute(
+            insert(revisions).from_select(
+                ["id", "note_id", "title", "content", "created_at"],
+                select(
+                    func.gen_random_uuid(), notes.c.id, notes.c.title,
+                    func.coalesce(notes.c.content, literal("", revisions.c.content.type)),
+                    func.timezone("UTC", func.now())
+                ).where(notes.c.id.in_(ids))
+            )
+        )
+        await db.execute(
+            update(notes)
+            .where(notes.c.id == bindparam("b_id"))
+            .values(
+                title=func.coalesce(bindparam("b_title", type_=String), notes.c.title),
+                content=func.coalesce(bindparam("b_content", type_=notes.c.content.type), notes.c.content),
+                change_seq=note_change_seq.next_value(),
+                updated_at=func.now()
+            ),
+            [{"b_id": op.id, "b_title": op.title, "b_content": op.content} for _, op in updates]
+        )
+        retagged = [op for _, op in updates if op.tags]
+        if retagged:
+            await db.execute(delete(note_tags).where(note_tags.c.note_id.in_([op.id for op in retagged])))
+            for op in retagged:
+                links.extend({"note_id": op.id, "tag_id": tags[name].id} for name in dict.fromkeys(op.tags))
+
+        result = await db.execute(select(notes.c.id, notes.c.change_seq).where(notes.c.id.in_(ids)))
+        versions = dict(result.all())
+        for index, op in updates:
+            results[index] = BulkNoteResult(index=index, op=op.op, status=200, id=op.id, change_seq=versions[op.id])
+            changes.append((op.id, versions[op.id], "updated"))
+
+    if links:
+        await db.execute(insert(note_tags), links)
+
+    if deletes:
+        result = await db.execute(
+            update(notes)
+            .where(notes.c.id.in_([op.id for _, op in deletes]))
+            .values(is_deleted=True, deleted_at=func.now(), change_seq=note_change_seq.next_value(),
+                    updated_at=func.now())
+            .returning(notes.c.id, notes.c.change_seq)
+        )
+        versions = dict(result.all())
+        for index, op in deletes:
+            results[index] = BulkNoteResult(index=index, op=op.op, status=200, id=op.id, change_seq=versions[op.id])
+            changes.append((op.id, versions[op.id], "deleted"))
+
+    return results, changes
+
+
+def _failed(chunk: List[Tuple[int, BulkNoteOp]], status: int, error: str) -> Dict[int, BulkNoteResult]:
+    return {index: BulkNoteResult(index=index, op=op.op, status=status, id=op.id, error=error) for index, op in chunk}
+
+
+async def bulk_write(db: AsyncSession, owner_id: UUID, operations: List[BulkNoteOp],
+                     atomic: bool) -> Tuple[List[BulkNoteResult], bool]:
+    """Apply operations in chunks; returns (results in request order, whether everything was applied).
+
+    Each chunk commits on its own, so a failing chunk doesn't undo the
+    others. With atomic=True everything runs in one transaction that is
+    rolled back if any operation fails.
+    """
+    results: Dict[int, BulkNoteResult] = {}
+    pending: List[Change] = []
+
+    for chunk in chunks(operations, settings.BULK_CHUNK_SIZE):
+        try:
+            chunk_results, changes = await apply_chunk(db, owner_id, chunk)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"❌ Bulk note write failed: {e}")
+            results.update(_failed(chunk, 500, f"Database error: {type(e).__name__}"))
+            if atomic:
+                pending = []
+                break
+            continue
+
+        results.update(chunk_results)
+        if atomic:
+            pending.extend(changes)
+            if any(result.status >= 400 for result in chunk_results.values()):
+                break  # it's all getting rolled back, skip the rest
+        else:
+            await db.commit()
+            await after_notes_write(owner_id, changes)
+
+    if atomic:
+        if len(results) == len(operations) and all(result.status < 400 for result in results.values()):
+            await db.commit()
+            await after_notes_write(owner_id, pending)
+        else:
+            await db.rollback()
+            applied = [(index, operations[index]) for index in range(len(operations))
+                       if index not in results or results[index].status < 400]
+            results.update(_failed(applied, 424, "Not applied: another operation failed"))
+
+    ordered = [results[index] for index in range(len(operations))]
+    return ordered, all(result.status < 400 for result in ordered)
@@ -0,0 +1,79 @@
+import asyncio
+import secrets
+import weakref
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.metrics import register_cache
+
+
+class NoteResponseCache:
+    """Serialized JSON of the note read endpoints, per owner.
+
+    Entries are keyed by the owner's current generation, a random token
+    that every committed note write drops (invalidate); the next reader
+    starts a new one, so a write orphans all of the owner's cached
+    responses at once and they expire through the TTL. Readers fetch the
+    generation before querying, so a response read before a commit can
+    only be stored under the old one.
+
+    Concurrent misses for the same key in this process wait for the first
+    one to load and store it, instead of all querying the database.
+
+    Off with the per-process memory backend unless allow_memory is set:
+    a write would only invalidate the writer's process, and the other
+    workers would serve old responses until the TTL ran out.
+    """
+
+    def __init__(self, ttl_seconds: float, allow_memory: bool = False):
+        self.enabled = ttl_seconds > 0 and (settings.CACHE_BACKEND != "memory" or allow_memory)
+        self.cache = Cache("notes", ttl_seconds)
+        self.generations = Cache("notes-gen", None)  # no expiry; a lost one only orphans entries
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.coalesced = 0
+
+    async def _generation(self, owner_id: UUID) -> str:
+        generation = await self.generations.get(str(owner_id))
+        if generation is None:
+            generation = secrets.token_hex(8).encode()
+            await self.generations.set(str(owner_id), generation)
+        return generation.decode()
+
+    async def get_or_load(self, owner_id: UUID, name: str,
+                          load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[bytes]:
+        """Cached body for name (e.g. "list", "note:<id>"), else load() and store it. None is not cached."""
+        if not self.enabled:
+            return await load()
+
+        key = f"{owner_id}:{await self._generation(owner_id)}:{name}"
+        body = await self.cache.get(key)
+        if body is not None:
+            return body
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        waited = lock.locked()
+        if waited:
+            self.coalesced += 1
+        async with lock:
+            # whoever held the lock has stored it meanwhile
+            body = await self.cache.get(key) if waited else None
+            if body is None:
+                body = await load()
+                if body is not None:
+                    await self.cache.set(key, body)
+        return body
+
+    async def invalidate(self, owner_id: UUID) -> None:
+        if self.enabled:
+            await self.generations.delete(str(owner_id))
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "coalesced": self.coalesced, **self.cache.stats()}
+
+
+note_response_cache = NoteResponseCache(settings.NOTE_CACHE_TTL_SECONDS, settings.NOTE_CACHE_IN_MEMORY)
+register_cache("notes", note_response_cache.stats)
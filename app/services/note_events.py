@@ -0,0 +1,44 @@
+from typing import List, Tuple
+from uuid import UUID
+
+from app.core.metrics import cache_invalidation_failures
+from app.services.markdown_service import MarkdownService
+from app.services.note_cache import note_response_cache
+from app.services.note_stream import note_broker
+
+
+async def after_note_write(note_id: UUID, owner_id: UUID, change_seq: int, kind: str) -> None:
+    """Called after a note change is committed (kind: created, updated, deleted or restored).
+
+    Drops cached data derived from the note and notifies the owner's event streams.
+    """
+    await after_notes_write(owner_id, [(note_id, change_seq, kind)])
+
+
+async def after_notes_write(owner_id: UUID, changes: List[Tuple[UUID, int, str]]) -> None:
+    """after_note_write for several committed changes of one owner, (note_id, change_seq, kind) each.
+
+    Everything here is best effort: the writes are committed, and failing
+    the request now would only make clients retry them. Rendered HTML is
+    checked against the markdown's hash and note responses expire after
+    NOTE_CACHE_TTL_SECONDS, so a missed invalidation only serves stale
+    lists for that long.
+    """
+    if not changes:
+        return
+    invalidations = (
+        ("render", lambda: MarkdownService.invalidate(*(note_id for note_id, _, _ in changes))),
+        ("notes", lambda: note_response_cache.invalidate(owner_id)),
+    )
+    for cache, invalidate in invalidations:
+        try:
+            await invalidate()
+        except Exception as e:
+            cache_invalidation_failures.labels(cache).inc()
+            print(f"⚠️ Could not invalidate the {cache} cache: {type(e).__name__}: {e}")
+    try:
+        for note_id, change_seq, kind in changes:
+            await note_broker.publish(note_id, owner_id, change_seq, kind)
+    except Exception as e:
+        # the writes are committed; streams catch up from Last-Event-ID or /notes/changes
+        print(f"⚠️ Could not publish note event: {type(e).__name__}: {e}")
@@ -1,17 +1,44 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
+from app.core.fast_json import field_names, projection
 from app.models.note import Note
-from app.models.tags import Tag
+from app.models.note_purge import purged_through
+from app.models.tags import Tag, note_tags
+from app.services.note_events import after_note_write
 from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from typing import Dict, Iterable, List, Optional
 from uuid import UUID
 
 from app.schemas.tags import TagOut
 
 
+async def resolve_tags(db: AsyncSession, names: Iterable[str]) -> Dict[str, Tag]:
+    """Tags by name, creating missing ones; a fixed number of queries however many names.
+
+    Concurrent requests creating the same tag don't fail: the insert
+    skips names that exist by then and the second select picks them up.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    result = await db.execute(select(Tag).where(Tag.name.in_(names)))
+    tags = {tag.name: tag for tag in result.scalars()}
+    missing = names - tags.keys()
+    if missing:
+        await db.execute(
+            pg_insert(Tag).values([{"name": name} for name in sorted(missing)])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await db.execute(select(Tag).where(Tag.name.in_(missing)))
+        tags.update((tag.name, tag) for tag in result.scalars())
+    return tags
+
+
 async def create_note(db: AsyncSession, note_data, owner_id):
     # Create the note
     new_note = Note(
@@ -21,18 +48,11 @@ async def create_note(db: AsyncSession, note_data, owner_id):
     )
 
     # Handle tags
-    tags_list = []
-    for tag_name in note_data.tags:
-        result = await db.execute(select(Tag).where(Tag.name == tag_name))
-        tag = result.scalar_one_or_none()
-        if not tag:
-            tag = Tag(name=tag_name)
-            db.add(tag)
-        tags_list.append(tag)
-
-    new_note.tags = tags_list
+    tags = await resolve_tags(db, note_data.tags)
+    new_note.tags = [tags[tag_name] for tag_name in dict.fromkeys(note_data.tags)]
     db.add(new_note)
     await db.commit()
+    await after_note_write(new_note.id, owner_id, new_note.change_seq, "created")
     await db.refresh(new_note)  # reload the note with tags
 
     # Make sure tags are loaded properly
@@ -49,6 +69,98 @@ async def get_notes(db: AsyncSession, owner_id: UUID):
     notes = result.scalars().all()
     return notes
 
+
+# Column projection for the fast list path; tags are added per note
+NOTE_FIELDS = field_names(NoteResponse)
+NOTE_COLUMN_FIELDS = field_names(NoteResponse, exclude={"tags"})
+NOTE_COLUMNS = projection(NoteResponse, Note, exclude={"tags"})
+
+
+async def get_note_rows(db: AsyncSession, owner_id: UUID, tag_id: Optional[int] = None,
+                        note_id: Optional[UUID] = None, deleted: bool = False) -> List[dict]:
+    """Same notes (and JSON shape) as get_notes serialized through NoteResponse, as plain dicts.
+
+    Two column queries (notes, then their tags) instead of ORM objects,
+    for the list endpoints that return thousands of notes.
+    """
+    # a literal is_deleted, so the partial indexes on live / trashed notes apply
+    note_filter = [Note.owner_id == owner_id, Note.is_deleted == deleted]
+    if note_id is not None:
+        note_filter.append(Note.id == note_id)
+    if tag_id is not None:
+        note_filter.append(Note.id.in_(select(note_tags.c.note_id).where(note_tags.c.tag_id == tag_id)))
+
+    note_query = select(*NOTE_COLUMNS).where(*note_filter)
+    if deleted:
+        note_query = note_query.order_by(Note.deleted_at.desc())
+    note_result = await db.execute(note_query)
+    note_rows = note_result.all()
+    tag_rows = []
+    if note_rows:
+        tag_result = await db.execute(
+            select(note_tags.c.note_id, Tag.id, Tag.name)
+            .join(Tag, note_tags.c.tag_id == Tag.id)
+            .where(note_tags.c.note_id.in_(select(Note.id).where(*note_filter)))
+        )
+        tag_rows = tag_result.all()
+
+    return note_rows_to_dicts(note_rows, tag_rows)
+
+
+async def get_note_changes(db: AsyncSession, owner_id: UUID, since: int, limit: int) -> dict:
+    """Notes of owner created, changed or deleted after change_seq since, oldest first.
+
+    Reads limit + 1 rows to tell whether there is another page. If notes
+    changed after since have been purged from the trash, the changes
+    can't bring the client up to date: it gets resync instead.
+    """
+    note_result = await db.execute(
+        select(*NOTE_COLUMNS)
+        .where(Note.owner_id == owner_id, Note.change_seq > since)
+        .order_by(Note.change_seq)
+        .limit(limit + 1)
+    )
+    note_rows = note_result.all()
+    # Checked after reading the notes: a note purged since then is in the watermark
+    if since and since < await purged_through(db, owner_id):
+        return {"changes": [], "cursor": since, "has_more": False, "resync": True}
+    has_more = len(note_rows) > limit
+    note_rows = note_rows[:limit]
+
+    tag_rows = []
+    if note_rows:
+        tag_result = await db.execute(
+            select(note_tags.c.note_id, Tag.id, Tag.name)
+            .join(Tag, note_tags.c.tag_id == Tag.id)
+            .where(note_tags.c.note_id.in_([row.id for row in note_rows]))
+        )
+        tag_rows = tag_result.all()
+
+    changes = note_rows_to_dicts(note_rows, tag_rows)
+    return {
+        "changes": changes,
+        "cursor": changes[-1]["change_seq"] if changes else since,
+        "has_more": has_more,
+        "resync": False,
+    }
+
+
+def note_rows_to_dicts(note_rows, tag_rows) -> List[dict]:
+    """NOTE_COLUMNS rows plus (note_id, tag id, tag name) rows -> NoteResponse-shaped dicts"""
+    notes = {}
+    for row in note_rows:
+        values = dict(zip(NOTE_COLUMN_FIELDS, row))
+        values["tags"] = []
+        notes[values["id"]] = values
+
+    for note_id, tag_pk, tag_name in tag_rows:
+        note = notes.get(note_id)
+        if note is not None:  # a note created between the two queries
+            note["tags"].append({"id": tag_pk, "name": tag_name})
+
+    return [{name: values[name] for name in NOTE_FIELDS} for values in notes.values()]
+
+
 async def get_note_by_id(db: AsyncSession, note_id: UUID, owner_id: UUID):
     result = await db.execute(
         select(Note).
@@ -78,6 +190,7 @@ async def update_note(db: AsyncSession, note_id: UUID, owner_id: UUID, note_data
         note.content = note_data.content
 
     await db.commit()
+    await after_note_write(note.id, owner_id, note.change_seq, "updated")
     await db.refresh(note)
 
     # Convert tags to Pydantic
@@ -90,7 +203,9 @@ async def update_note(db: AsyncSession, note_id: UUID, owner_id: UUID, note_data
         title=note.title,
         content=note.content,
         is_deleted=note.is_deleted,
-
+        change_seq=note.change_seq,
+        updated_at=note.updated_at,
+        deleted_at=note.deleted_at,
         tags=tags_out
     )
 
@@ -100,8 +215,26 @@ async def soft_delete_note(db: AsyncSession, note_id: UUID, owner_id: UUID):
         select(Note).where(Note.id == note_id, Note.owner_id == owner_id)
     )
     note = result.scalar_one_or_none()
-    if note:
+    if note and not note.is_deleted:
         note.is_deleted = True
+        note.deleted_at = func.now()
         await db.commit()
+        await after_note_write(note.id, owner_id, note.change_seq, "deleted")
         await db.refresh(note)
     return note
+
+
+async def restore_note(db: AsyncSession, note_id: UUID, owner_id: UUID):
+    """Take a note out of the trash; None if it isn't there (or was purged)"""
+    result = await db.execute(
+        select(Note)
+        .options(selectinload(Note.tags))
+        .where(Note.id == note_id, Note.owner_id == owner_id, Note.is_deleted == True)
+    )
+    note = result.scalar_one_or_none()
+    if note:
+        note.is_deleted = False
+        note.deleted_at = None
+        await db.commit()
+        await after_note_write(note.id, owner_id, note.change_seq, "restored")
+    return note
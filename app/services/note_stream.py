@@ -0,0 +1,188 @@
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Set
+from uuid import UUID
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.note import Note
+from app.models.note_purge import purged_through
+
+CHANNEL = "note_events"
+
+
+class Subscription:
+    """One open event stream; the queue is bounded so a slow client can't pile up memory"""
+
+    def __init__(self, owner_id: str, max_queued: int):
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue = asyncio.Queue(max_queued)
+        self.dropped = False
+
+
+class NoteEventBroker:
+    """Fans note change events out to the event streams of their owner.
+
+    With NOTE_EVENTS_BACKEND=memory events only reach streams of this
+    process. With postgres, publish() sends a NOTIFY and every worker
+    delivers what its LISTEN connection receives, so a write in one
+    worker reaches streams in all of them.
+    """
+
+    def __init__(self, backend: str, max_queued: int):
+        self.backend = backend
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, owner_id: UUID) -> Subscription:
+        subscription = Subscription(str(owner_id), self.max_queued)
+        self._subscribers[subscription.owner_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.owner_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.owner_id]
+
+    def _drop(self, subscription: Subscription) -> None:
+        subscription.dropped = True
+        self.unsubscribe(subscription)
+        self.dropped += 1
+        if not subscription.queue.full():
+            subscription.queue.put_nowait(None)  # wake the stream up
+
+    def deliver(self, event: dict) -> None:
+        """Queue event for the local streams of its owner"""
+        for subscription in list(self._subscribers.get(event["owner_id"], ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)  # it resumes from its Last-Event-ID on reconnect
+
+    async def publish(self, note_id: UUID, owner_id: UUID, change_seq: int, kind: str) -> None:
+        event = {"id": str(note_id), "owner_id": str(owner_id), "change_seq": change_seq, "kind": kind}
+        self.published += 1
+        if self.backend != "postgres":
+            self.deliver(event)
+            return
+        async with engine.connect() as conn:
+            await conn.execute(select(func.pg_notify(CHANNEL, orjson.dumps(event).decode())))
+            await conn.commit()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.deliver(orjson.loads(payload))
+
+    async def start(self) -> None:
+        if self.backend == "postgres" and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        for subscriptions in list(self._subscribers.values()):
+            for subscription in list(subscriptions):
+                self._drop(subscription)
+
+    async def _listen(self) -> None:
+        """Keep one pooled connection LISTENing, reconnecting after failures"""
+        connected_before = False
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    await raw.add_listener(CHANNEL, self._on_notify)
+                    if connected_before:
+                        # events sent while we were away are lost; make the streams resume
+                        for subscriptions in list(self._subscribers.values()):
+                            for subscription in list(subscriptions):
+                                self._drop(subscription)
+                    connected_before = True
+                    print(f"✅ Listening for note events on {CHANNEL}")
+                    try:
+                        while not raw.is_closed():
+                            await asyncio.sleep(5)
+                    finally:
+                        if not raw.is_closed():
+                            await raw.remove_listener(CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Note event listener lost its connection: {type(e).__name__}: {e}")
+                await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "streams": sum(len(subscriptions) for subscriptions in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+note_broker = NoteEventBroker(settings.NOTE_EVENTS_BACKEND, settings.NOTE_EVENTS_QUEUE_SIZE)
+
+
+def format_event(event: dict) -> bytes:
+    data = {"id": event["id"], "change_seq": event["change_seq"], "kind": event["kind"]}
+    return b"id: %d\nevent: note\ndata: %s\n\n" % (event["change_seq"], orjson.dumps(data))
+
+
+async def missed_events(db: AsyncSession, owner_id: UUID, since: int, limit: int) -> List[dict]:
+    """Changes after since as events; only the latest version of each note is left to replay"""
+    result = await db.execute(
+        select(Note.id, Note.change_seq, Note.is_deleted)
+        .where(Note.owner_id == owner_id, Note.change_seq > since)
+        .order_by(Note.change_seq)
+        .limit(limit)
+    )
+    return [
+        {"id": str(note_id), "owner_id": str(owner_id), "change_seq": change_seq,
+         "kind": "deleted" if is_deleted else "updated"}
+        for note_id, change_seq, is_deleted in result.all()
+    ]
+
+
+async def note_event_stream(db: AsyncSession, owner_id: UUID, last_event_id: Optional[int]) -> AsyncIterator[bytes]:
+    """Server-sent events for one owner: replay after last_event_id, then live events and heartbeats"""
+    subscription = note_broker.subscribe(owner_id)  # before the replay, so nothing falls in between
+    try:
+        last_seq = 0
+        if last_event_id is not None:
+            limit = settings.NOTE_EVENTS_REPLAY_LIMIT
+            missed = await missed_events(db, owner_id, last_event_id, limit + 1)
+            if len(missed) > limit or last_event_id < await purged_through(db, owner_id):
+                # too far behind to replay, or missed notes that were purged since:
+                # the client should sync with GET /notes/changes
+                yield b"event: resync\ndata: {}\n\n"
+                return
+            for event in missed:
+                yield format_event(event)
+            last_seq = missed[-1]["change_seq"] if missed else last_event_id
+        await db.close()  # don't hold a connection for the lifetime of the stream
+
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.NOTE_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if event is None or subscription.dropped:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            if event["change_seq"] <= last_seq:
+                continue  # already sent by the replay
+            yield format_event(event)
+    finally:
+        note_broker.unsubscribe(subscription)
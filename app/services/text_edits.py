@@ -0,0 +1,93 @@
+from difflib import SequenceMatcher
+from typing import Any, Iterator, List, NamedTuple, Tuple
+
+
+class TextEdit(NamedTuple):
+    """Replace `length` characters at `offset` with `text`"""
+    offset: int
+    length: int
+    text: str
+    key: Any = None  # caller's id for the edit (issue id, op index, ...)
+
+
+def apply_edits(content: str, edits: List[TextEdit]) -> Tuple[str, List[TextEdit], List[TextEdit]]:
+    """Apply non-overlapping edits in one pass.
+
+    Offsets refer to the original content. Edits are applied in offset
+    order; an edit that overlaps an already applied one, or falls outside
+    the content, is not applied and is returned as a conflict.
+
+    Returns (new content, applied edits, conflicting edits).
+    """
+    pieces = []
+    applied = []
+    conflicts = []
+    cursor = 0
+
+    for edit in sorted(edits, key=lambda e: (e.offset, e.length)):
+        end = edit.offset + edit.length
+        if edit.offset < cursor or edit.length < 0 or end > len(content):
+            conflicts.append(edit)
+            continue
+
+        pieces.append(content[cursor:edit.offset])
+        pieces.append(edit.text)
+        cursor = end
+        applied.append(edit)
+
+    pieces.append(content[cursor:])
+    return "".join(pieces), applied, conflicts
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+    return starts
+
+
+def matching_blocks(base: str, current: str) -> Iterator[Tuple[int, int, int]]:
+    """(base offset, current offset, size) of text both versions share.
+
+    Lines are matched first, which keeps this fast on long notes; only
+    the lines that changed are compared character by character.
+    """
+    base_lines = base.splitlines(keepends=True)
+    current_lines = current.splitlines(keepends=True)
+    base_starts = _line_starts(base_lines)
+    current_starts = _line_starts(current_lines)
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, base_lines, current_lines, autojunk=False).get_opcodes():
+        base_start, base_end = base_starts[i1], base_starts[i2]
+        current_start, current_end = current_starts[j1], current_starts[j2]
+        if tag == "equal":
+            yield base_start, current_start, base_end - base_start
+        elif tag == "replace":
+            changed = SequenceMatcher(None, base[base_start:base_end], current[current_start:current_end])
+            for a, b, size in changed.get_matching_blocks():
+                if size:
+                    yield base_start + a, current_start + b, size
+
+
+def rebase_edits(base: str, current: str, edits: List[TextEdit]) -> Tuple[List[TextEdit], List[TextEdit]]:
+    """Move edits made against base onto current, a later version of the text.
+
+    An edit moves with the unchanged text it covers. One whose range was
+    itself changed in current can't be placed and is returned as a
+    conflict.
+
+    Returns (edits with offsets into current, conflicting edits).
+    """
+    if base == current:
+        return list(edits), []
+    blocks = list(matching_blocks(base, current))
+    moved = []
+    conflicts = []
+    for edit in edits:
+        end = edit.offset + edit.length
+        for base_start, current_start, size in blocks:
+            if base_start <= edit.offset and end <= base_start + size:
+                moved.append(edit._replace(offset=current_start + edit.offset - base_start))
+                break
+        else:
+            conflicts.append(edit)
+    return moved, conflicts
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.note import Note
+from app.models.note_purge import NotePurgeWatermark
+from app.models.tags import note_tags
+
+
+class TrashPurger:
+    """Hard-deletes notes that have been in the trash longer than the retention period.
+
+    Works in batches, one short transaction each, so it never holds many
+    row locks or a long transaction. Tag links are deleted with the note;
+    revisions and their grammar issues and jobs go through ON DELETE CASCADE.
+    Each owner's purge watermark is raised, so the change feed can tell
+    clients that missed the deletion to resync.
+    Rows are claimed with SKIP LOCKED, so every worker process can run
+    a purger without them getting in each other's way.
+    """
+
+    def __init__(self, retention_days: float, batch_size: int, interval_seconds: float):
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.purged = 0
+
+    async def start(self) -> None:
+        if self.retention_days > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                purged = await self.purge()
+                if purged:
+                    print(f"🗑️ Purged {purged} notes from the trash")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Trash purge failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def purge_batch(self, cutoff: datetime) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Note.id, Note.owner_id, Note.change_seq)
+                .where(Note.is_deleted == True, Note.deleted_at < cutoff)
+                .order_by(Note.deleted_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+            note_ids = [note_id for note_id, _, _ in rows]
+            watermarks: Dict[UUID, int] = {}
+            for _, owner_id, change_seq in rows:
+                watermarks[owner_id] = max(watermarks.get(owner_id, 0), change_seq)
+
+            # Tag links explicitly: databases created by create_all lack their cascade
+            await db.execute(delete(note_tags).where(note_tags.c.note_id.in_(note_ids)))
+            await db.execute(
+                delete(Note).where(Note.id.in_(note_ids)),
+                execution_options={"synchronize_session": False}
+            )
+            # The notes leave the change feed; clients behind them must resync
+            upsert = pg_insert(NotePurgeWatermark).values(
+                [{"owner_id": owner_id, "purged_through": seq} for owner_id, seq in watermarks.items()]
+            )
+            await db.execute(upsert.on_conflict_do_update(
+                index_elements=[NotePurgeWatermark.owner_id],
+                set_={"purged_through": func.greatest(NotePurgeWatermark.purged_through, upsert.excluded.purged_through)}
+            ))
+            await db.commit()
+        return len(note_ids)
+
+    async def purge(self) -> int:
+        """Purge everything past retention, batch by batch; returns the number of notes"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        total = 0
+        while True:
+            purged = await self.purge_batch(cutoff)
+            total += purged
+            self.purged += purged
+            if purged < self.batch_size:
+                return total
+            await asyncio.sleep(0)  # let requests in between batches
+
+
+trash_purger = TrashPurger(
+    settings.TRASH_RETENTION_DAYS,
+    settings.TRASH_PURGE_BATCH_SIZE,
+    settings.TRASH_PURGE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,19 @@
+import pytest
+
+from app.core.query_budget import expect_query_budgets, track_queries
+
+
+@pytest.fixture
+def sql_budget():
+    """SQL budget checks for a test.
+
+        async def test_list_notes(sql_budget, db):
+            with sql_budget(max_queries=3, max_repeats=1):
+                await get_note_rows(db, user.id)
+
+    The returned factory is track_queries, so a block over budget raises
+    QueryBudgetExceeded. Requests the test sends through the app are held
+    to their endpoint budgets as well (with QUERY_BUDGET_ENABLED).
+    """
+    with expect_query_budgets():
+        yield track_queries
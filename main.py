@@ -1,9 +1,24 @@
+import asyncio
+from typing import Optional
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import create_async_engine
-from app.api import auth, notes, grammar_routes, render
+from app.api import auth, notes, grammar_routes, render, system
+from app.core.cache import close_cache_backend
 from app.core.config import settings
-from app.models.user import Base
+from app.core.database import engine, replica_engine
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.readiness import readiness
+from app.core.schema import SchemaVersionError, check_schema
+from app.services.grammar_checker import init_checker, close_checker
+from app.services.grammar_jobs import grammar_jobs
+from app.services.grammar_batch import grammar_batches
+from app.services.markdown_service import MarkdownService
+from app.services.note_stream import note_broker
+from app.services.trash_purge import trash_purger
 
 app = FastAPI(title="Mark Down Notes API", description="Mark Down Notes API")
 
@@ -16,10 +31,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Startup event to create database tables
+# Opt-in SQL budget checks per request, to catch N+1 query loops
+if settings.QUERY_BUDGET_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Opt-in cProfile + span capture for requests carrying the profiling token
+if settings.PROFILING_ENABLED:
+    if settings.PROFILING_TOKEN:
+        app.add_middleware(ProfilingMiddleware)
+    else:
+        print("⚠️ PROFILING_ENABLED is set without PROFILING_TOKEN; profiling stays off")
+
+# Per-route latency, status codes and SQL statements per request (/metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Startup event to check the database schema
 @app.on_event("startup")
 async def startup():
-    """Create database tables on startup"""
+    """Check the database is migrated to the latest alembic revision"""
     try:
         # DEBUG: Print the DATABASE_URL (hide password)
         db_url = settings.DATABASE_URL
@@ -31,22 +60,83 @@ async def startup():
         else:
             print("❌ DATABASE_URL is None or empty!")
             raise ValueError("DATABASE_URL environment variable is not set")
-        
-        engine = create_async_engine(settings.DATABASE_URL, echo=True)
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        await engine.dispose()
-        print("✅ Database tables created successfully!")
+
+        # Tables are created by `alembic upgrade head`; here we only compare
+        # alembic_version with the migration head (one small query)
+        if settings.SCHEMA_CHECK != "off":
+            revisions = await check_schema(engine)
+            print(f"✅ Database schema is at {', '.join(sorted(revisions))}")
+    except SchemaVersionError as e:
+        if settings.SCHEMA_CHECK != "strict":
+            print(f"⚠️ {e}")
+            return
+        print(f"❌ {e}")
+        raise
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
+        print(f"❌ Error checking database schema: {e}")
         print(f"❌ Error type: {type(e).__name__}")
         raise
 
+
+_warm_up_task: Optional[asyncio.Task] = None
+
+
+async def warm_up():
+    """Load the renderer, create the grammar checker and start the grammar job and batch workers"""
+    steps = (
+        ("renderer", lambda: asyncio.to_thread(MarkdownService.warm_up)),
+        ("grammar_checker", init_checker),
+        ("grammar_jobs", grammar_jobs.start),
+        ("grammar_batches", grammar_batches.start),
+    )
+    for name, step in steps:
+        try:
+            await step()
+            readiness.done(name)
+        except Exception as e:
+            readiness.fail(name, e)
+            print(f"❌ Warm-up step {name} failed: {e}")
+    if readiness.is_ready():
+        print(f"✅ Warm-up finished in {readiness.snapshot()['warm_up_seconds']}s")
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Run the heavier start-up work in the background; /system/ready reports when it is done"""
+    global _warm_up_task
+    readiness.expect("renderer", "grammar_checker", "grammar_jobs", "grammar_batches")
+    _warm_up_task = asyncio.create_task(warm_up())
+    await note_broker.start()
+    await trash_purger.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    """Stop the grammar job and batch workers, close the checker's pooled connections, end the event streams and the trash purge"""
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+        await asyncio.gather(_warm_up_task, return_exceptions=True)
+    await grammar_jobs.stop()
+    await grammar_batches.stop()
+    await close_checker()
+    await note_broker.stop()
+    await trash_purger.stop()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    """Close the pooled database connections and the cache backend"""
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    await close_cache_backend()
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(notes.router)
 app.include_router(grammar_routes.router)
 app.include_router(render.router)
+app.include_router(system.router)
 
 
 @app.get("/")
@@ -57,3 +147,9 @@ async def root():
         "status": "OK",
         "docs": "/docs"
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,94 @@
+"""
+Benchmark storage saved against CPU spent for the content compression options.
+
+Uses a synthetic markdown corpus (notes of mixed sizes sharing typical
+structure), or the bodies of a text file per note with --files. For each
+option prints the stored size relative to raw and the encode/decode
+throughput. The zstd dictionary is trained on half the corpus and
+measured on the other half.
+
+    python -m scripts.bench_compression --notes 5000
+    python -m scripts.bench_compression --files notes/*.md
+"""
+import argparse
+import random
+import time
+
+from app.core.compression import TextCodec
+
+WORDS = ("note", "meeting", "project", "deadline", "review", "draft", "update", "client", "design",
+         "budget", "team", "release", "fix", "issue", "plan", "summary", "action", "owner", "next", "week")
+
+
+def synthetic_note(rng: random.Random, paragraphs: int) -> str:
+    lines = [f"# {rng.choice(WORDS).title()} {rng.choice(WORDS)} {rng.randint(1, 99)}", ""]
+    for _ in range(paragraphs):
+        kind = rng.random()
+        if kind < 0.3:
+            lines.append(f"## {rng.choice(WORDS).title()}")
+        elif kind < 0.6:
+            lines.extend(f"- [ ] {' '.join(rng.choices(WORDS, k=rng.randint(3, 8)))}" for _ in range(rng.randint(2, 5)))
+        else:
+            lines.append(" ".join(rng.choices(WORDS, k=rng.randint(15, 60))).capitalize() + ".")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def corpus(notes: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    # mostly short notes, a long tail of big ones
+    return [synthetic_note(rng, min(int(rng.paretovariate(1.2)), 400)) for _ in range(notes)]
+
+
+def measure(codec: TextCodec, texts: list) -> dict:
+    start = time.perf_counter()
+    encoded = [codec.encode(text) for text in texts]
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    decoded = [codec.decode(value) for value in encoded]
+    decode_seconds = time.perf_counter() - start
+    assert decoded == texts
+    raw = sum(len(text.encode("utf-8")) for text in texts)
+    return {
+        "ratio": sum(len(value) for value in encoded) / raw,
+        "encode_mb_s": raw / 1e6 / encode_seconds,
+        "decode_mb_s": raw / 1e6 / decode_seconds,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare content compression options")
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--files", nargs="*", help="use these files as notes instead of synthetic ones")
+    parser.add_argument("--min-bytes", type=int, default=512)
+    parser.add_argument("--dict-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    if args.files:
+        texts = [open(path, encoding="utf-8").read() for path in args.files]
+    else:
+        texts = corpus(args.notes)
+    training, measured = texts[::2], texts[1::2]
+    raw_mb = sum(len(text.encode("utf-8")) for text in measured) / 1e6
+    print(f"{len(measured)} notes, {raw_mb:.1f} MB raw, median {sorted(map(len, measured))[len(measured) // 2]} chars")
+
+    options = [
+        ("off", TextCodec("off", args.min_bytes)),
+        ("zlib", TextCodec("zlib", args.min_bytes)),
+        ("zlib level 1", TextCodec("zlib", args.min_bytes, level=1)),
+    ]
+    try:
+        options.append(("zstd", TextCodec("zstd", args.min_bytes)))
+        options.append(("zstd level 9", TextCodec("zstd", args.min_bytes, level=9)))
+        zstandard = TextCodec._zstd()
+        dictionary = zstandard.train_dictionary(args.dict_size, [text.encode("utf-8") for text in training])
+        with_dict = TextCodec("zstd", args.min_bytes)
+        with_dict._dictionary, with_dict._dictionary_loaded = dictionary, True
+        options.append((f"zstd + {args.dict_size // 1024} KB dict", with_dict))
+    except RuntimeError as e:
+        print(f"  (skipping zstd: {e})")
+
+    print(f"  {'option':<22} {'stored':>8} {'encode':>12} {'decode':>12}")
+    for name, codec in options:
+        result = measure(codec, measured)
+        print(f"  {name:<22} {result['ratio']:>7.1%} {result['encode_mb_s']:>8.0f} MB/s {result['decode_mb_s']:>8.0f} MB/s")
@@ -0,0 +1,92 @@
+"""
+Benchmark the note list response paths.
+
+  orm:  ORM Note objects -> response_model=list[NoteResponse] -> JSONResponse
+        (how GET /notes/ worked before)
+  fast: column rows -> note_rows_to_dicts -> FastJSONResponse (GET /notes/ now)
+
+Both run as real FastAPI routes over synthetic data (no database), and the
+script checks that both return byte-identical JSON.
+
+    python -m scripts.bench_json --notes 10000 --tags 3 --repeat 5
+"""
+import argparse
+import datetime
+import statistics
+import time
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.fast_json import FastJSONResponse
+from app.models.note import Note
+from app.models.note_revision import NoteRevision  # noqa: F401 (mapper registry)
+from app.models.grammar_issue import GrammarIssue  # noqa: F401
+from app.models.tags import Tag
+from app.schemas.note import NoteResponse
+from app.services.note_service import note_rows_to_dicts
+
+
+def make_data(note_count: int, tags_per_note: int):
+    owner_id = uuid.uuid4()
+    updated_at = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    tags = [Tag(id=i, name=f"tag-{i}") for i in range(50)]
+    orm_notes, note_rows, tag_rows = [], [], []
+    for i in range(note_count):
+        note_id = uuid.uuid4()
+        content = f"# Note {i}\n\nSome *markdown* content with ünïcode and \"quotes\".\n" * 5
+        note_tags = [tags[(i + k) % len(tags)] for k in range(tags_per_note)]
+        orm_notes.append(Note(id=note_id, title=f"Note {i}", content=content, owner_id=owner_id,
+                              is_deleted=False, change_seq=i, updated_at=updated_at, deleted_at=None, tags=note_tags))
+        note_rows.append((note_id, f"Note {i}", content, owner_id, False, i, updated_at, None))
+        tag_rows.extend((note_id, tag.id, tag.name) for tag in note_tags)
+    return orm_notes, note_rows, tag_rows
+
+
+def build_app(orm_notes, note_rows, tag_rows) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/orm", response_model=list[NoteResponse])
+    async def orm_path():
+        return orm_notes
+
+    @app.get("/fast", response_model=list[NoteResponse])
+    async def fast_path():
+        return FastJSONResponse(note_rows_to_dicts(note_rows, tag_rows))
+
+    return app
+
+
+def timed(client: TestClient, path: str, repeat: int):
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        samples.append(time.perf_counter() - start)
+        body = response.content
+    return samples, body
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ORM/Pydantic and column/orjson list serialization")
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--tags", type=int, default=3, help="tags per note")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_data(args.notes, args.tags)
+    client = TestClient(build_app(*data))
+    client.get("/orm")
+    client.get("/fast")
+
+    orm_samples, orm_body = timed(client, "/orm", args.repeat)
+    fast_samples, fast_body = timed(client, "/fast", args.repeat)
+
+    orm_ms = statistics.median(orm_samples) * 1000
+    fast_ms = statistics.median(fast_samples) * 1000
+    print(f"{args.notes} notes x {args.tags} tags, {len(orm_body) / 1e6:.1f} MB of JSON, median of {args.repeat}")
+    print(f"  orm + pydantic : {orm_ms:8.1f} ms")
+    print(f"  rows + orjson  : {fast_ms:8.1f} ms   ({orm_ms / fast_ms:.1f}x faster)")
+    print(f"  identical JSON : {orm_body == fast_body}")
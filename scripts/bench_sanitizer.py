@@ -0,0 +1,60 @@
+"""
+Benchmark the HTML sanitizer backends on rendered notes.
+
+Renders a synthetic markdown corpus (or the files given with --files)
+once, then times each backend's clean() over the HTML. Prints throughput,
+the time for the largest note, and the share of a full render that
+sanitizing takes.
+
+    python -m scripts.bench_sanitizer --notes 2000
+    python -m scripts.bench_sanitizer --files notes/*.md
+"""
+import argparse
+import time
+
+import markdown
+
+from app.services.html_sanitizer import SANITIZERS, create_sanitizer
+from app.services.markdown_service import MarkdownService
+from scripts.bench_compression import corpus
+
+
+def timed(function, values: list) -> float:
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML sanitizer backends")
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--files", nargs="*", help="use these files as notes instead of synthetic ones")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.files:
+        texts = [open(path, encoding="utf-8").read() for path in args.files]
+    else:
+        texts = corpus(args.notes)
+
+    def render(text):
+        return markdown.markdown(text, extensions=MarkdownService.MARKDOWN_EXTENSIONS, output_format="html5")
+
+    render(texts[0])  # load the extensions
+    markdown_seconds = min(timed(render, texts) for _ in range(args.repeat))
+    pages = [render(text) for text in texts]
+    largest = max(pages, key=len)
+    html_mb = sum(len(page.encode("utf-8")) for page in pages) / 1e6
+    print(f"{len(pages)} notes, {html_mb:.1f} MB of HTML, largest {len(largest) / 1e3:.0f} KB; "
+          f"markdown itself {markdown_seconds * 1e3:.0f} ms")
+
+    print(f"  {'backend':<8} {'total':>9} {'throughput':>12} {'largest':>10} {'of render':>10}")
+    for name in SANITIZERS:
+        sanitizer = create_sanitizer(name, MarkdownService.ALLOWED_TAGS, MarkdownService.ALLOWED_ATTRIBUTES,
+                                     MarkdownService.ALLOWED_PROTOCOLS)
+        sanitizer.clean(largest)  # imports
+        seconds = min(timed(sanitizer.clean, pages) for _ in range(args.repeat))
+        largest_seconds = min(timed(sanitizer.clean, [largest]) for _ in range(args.repeat))
+        print(f"  {name:<8} {seconds * 1e3:>6.0f} ms {html_mb / seconds:>7.1f} MB/s {largest_seconds * 1e3:>7.1f} ms "
+              f"{seconds / (seconds + markdown_seconds):>9.0%}")
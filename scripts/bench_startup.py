@@ -0,0 +1,86 @@
+"""
+Startup time benchmark.
+
+Measures, over several fresh interpreters:
+  - import:   time to `import main` (module imports, routers, settings)
+  - listening: time from process start until GET / answers (--serve)
+  - ready:    time until GET /system/ready returns 200 (--serve)
+
+    python -m scripts.bench_startup --runs 5
+    python -m scripts.bench_startup --runs 5 --serve --port 8765
+
+--serve needs a reachable, migrated database, like the app itself.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", IMPORT_SNIPPET],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def wait_for(url: str, started: float, timeout: float, want_status: int = 200) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == want_status:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} did not return {want_status} within {timeout}s")
+
+
+def time_serve(port: int, timeout: float) -> tuple:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(os.environ)
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        listening = wait_for(f"{base}/", started, timeout)
+        ready = wait_for(f"{base}/system/ready", started, timeout)
+        return listening, ready
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summary(name: str, samples: list) -> None:
+    print(f"{name:<10} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure application startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--serve", action="store_true", help="also time uvicorn until listening and ready")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    summary("import", [time_import() for _ in range(args.runs)])
+
+    if args.serve:
+        listening, ready = [], []
+        for _ in range(args.runs):
+            first, second = time_serve(args.port, args.timeout)
+            listening.append(first)
+            ready.append(second)
+        summary("listening", listening)
+        summary("ready", ready)
@@ -0,0 +1,87 @@
+"""
+Re-encode stored note and revision bodies with the current compression settings.
+
+Run after the bytea migration (which stores everything raw) and after
+changing CONTENT_COMPRESSION / CONTENT_COMPRESSION_DICT. Works in batches,
+one transaction each, so it can run while the app is serving and can be
+stopped and restarted at any point. Values that come out the same are
+not written, and a row is only rewritten if its stored bytes are still
+the ones that were read, so concurrent saves are never overwritten.
+
+    python -m scripts.compress_content --batch 500
+    python -m scripts.compress_content --dry-run
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import LargeBinary, bindparam, column, select, table
+
+from app.core.compression import text_codec
+from app.core.database import AsyncSessionLocal, engine
+
+TABLES = ("notes", "note_revisions")
+
+
+async def recompress(table_name: str, batch_size: int, dry_run: bool) -> dict:
+    # plain bytea columns, so rows come back as stored (not through CompressedText)
+    rows_table = table(table_name, column("id"), column("content", LargeBinary()))
+    stats = {"rows": 0, "rewritten": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = None
+
+    while True:
+        query = select(rows_table.c.id, rows_table.c.content).order_by(rows_table.c.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(rows_table.c.id > last_id)
+
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(query)).all()
+            if not rows:
+                return stats
+
+            updates = []
+            for row_id, value in rows:
+                if value is None:
+                    continue
+                encoded = text_codec.encode(text_codec.decode(value))
+                stats["rows"] += 1
+                stats["bytes_before"] += len(value)
+                stats["bytes_after"] += len(encoded)
+                if encoded != value:
+                    updates.append({"row_id": row_id, "stored": value, "encoded": encoded})
+
+            if updates and not dry_run:
+                # only where the body is still what was read: a note saved in
+                # between keeps its new body (and is re-encoded on the next run)
+                await db.execute(
+                    rows_table.update()
+                    .where(rows_table.c.id == bindparam("row_id"), rows_table.c.content == bindparam("stored"))
+                    .values(content=bindparam("encoded")),
+                    updates
+                )
+                await db.commit()
+            stats["rewritten"] += len(updates)
+            last_id = rows[-1][0]
+
+
+async def main(batch_size: int, dry_run: bool) -> None:
+    print(f"codec={text_codec.codec} level={text_codec.level} min_bytes={text_codec.min_bytes} "
+          f"dictionary={text_codec.dictionary_path or '-'}{' (dry run)' if dry_run else ''}")
+    try:
+        for table_name in TABLES:
+            start = time.perf_counter()
+            stats = await recompress(table_name, batch_size, dry_run)
+            saved = stats["bytes_before"] - stats["bytes_after"]
+            print(f"  {table_name:<15} {stats['rows']:>8} rows, {stats['rewritten']:>8} rewritten, "
+                  f"{stats['bytes_before'] / 1e6:8.2f} MB -> {stats['bytes_after'] / 1e6:8.2f} MB "
+                  f"({saved / 1e6:+.2f} MB saved) in {time.perf_counter() - start:.1f}s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encode note/revision bodies with the current compression settings")
+    parser.add_argument("--batch", type=int, default=500, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="only report the sizes")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch, args.dry_run))
@@ -0,0 +1,118 @@
+"""
+Load test for the database engine and connection pool settings.
+
+Runs many concurrent sessions, each doing a short query (plus optional
+server-side sleep to model slow queries), once per engine configuration,
+and prints throughput, latency and pool wait time side by side.
+
+    python -m scripts.db_pool_load_test --requests 2000 --concurrency 100
+    python -m scripts.db_pool_load_test --sweep pool_size=5,10,20 --sweep max_overflow=0,10
+    python -m scripts.db_pool_load_test --sweep pool_pre_ping=false,true --sweep statement_cache_size=0,100
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import build_engine, pool_stats
+
+CONNECT_ARGS = {"statement_cache_size", "prepared_statement_cache_size"}
+
+
+def parse_value(value: str):
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def engine_options(config: dict) -> dict:
+    options = {}
+    connect_args = {}
+    for key, value in config.items():
+        if key in CONNECT_ARGS:
+            connect_args[key] = value
+        else:
+            options[key] = value
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+async def run_one(config: dict, total: int, concurrency: int, sleep_ms: float) -> dict:
+    engine = build_engine(**engine_options(config))
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    await session.execute(text("SELECT pg_sleep(:s)"), {"s": sleep_ms / 1000})
+                    await session.execute(text("SELECT count(*) FROM notes"))
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    stats = pool_stats(engine)
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "config": config,
+        "throughput": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+        "errors": errors,
+        "wait_avg_ms": stats["wait_seconds_total"] / max(stats["checkouts"], 1) * 1000,
+        "wait_max_ms": stats["wait_seconds_max"] * 1000,
+        "timeouts": stats["timeouts"],
+    }
+
+
+async def main(sweeps, total: int, concurrency: int, sleep_ms: float) -> None:
+    keys = [key for key, _ in sweeps]
+    configs = [dict(zip(keys, values)) for values in itertools.product(*(values for _, values in sweeps))]
+
+    print(f"{total} requests, concurrency {concurrency}, {sleep_ms} ms server sleep per request\n")
+    print(f"{'config':<50} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'wait avg':>9} {'wait max':>9} {'errors':>7}")
+    for config in configs:
+        row = await run_one(config, total, concurrency, sleep_ms)
+        label = ", ".join(f"{k}={v}" for k, v in config.items()) or "settings defaults"
+        print(
+            f"{label:<50} {row['throughput']:>8.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['wait_avg_ms']:>9.2f} {row['wait_max_ms']:>9.2f} {row['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare engine/pool settings under load")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sleep-ms", type=float, default=5.0, help="server-side pg_sleep per request")
+    parser.add_argument(
+        "--sweep", action="append", default=[],
+        help="engine option and values to compare, e.g. pool_size=5,10,20 (repeatable)"
+    )
+    args = parser.parse_args()
+
+    sweeps = []
+    for sweep in args.sweep:
+        key, _, values = sweep.partition("=")
+        sweeps.append((key, [parse_value(v) for v in values.split(",")]))
+
+    asyncio.run(main(sweeps, args.requests, args.concurrency, args.sleep_ms))
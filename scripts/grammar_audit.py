@@ -0,0 +1,60 @@
+"""
+Nightly grammar/style audit over many notes.
+
+Checks the latest revision of every selected note through the same
+concurrency-limited pipeline as POST /notes/grammar-check/batch, writes
+issues in bulk, prints progress and a JSON summary at the end.
+
+    python -m scripts.grammar_audit                          # every note
+    python -m scripts.grammar_audit --owner-email a@b.com    # one workspace
+    python -m scripts.grammar_audit --tag docs --note-id <uuid> --note-id <uuid>
+"""
+import argparse
+import asyncio
+import json
+import sys
+from uuid import UUID
+
+from sqlalchemy.future import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.grammar_batch import run_batch
+from app.services.grammar_checker import init_checker, close_checker
+
+
+def print_progress(done: int, total: int) -> None:
+    sys.stderr.write(f"\r{done}/{total} revisions checked")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+async def main(owner_email, tag, note_ids) -> int:
+    await init_checker()
+    try:
+        async with AsyncSessionLocal() as db:
+            owner_id = None
+            if owner_email:
+                result = await db.execute(select(User.id).where(User.email == owner_email))
+                owner_id = result.scalar_one_or_none()
+                if owner_id is None:
+                    print(f"No user with email {owner_email}", file=sys.stderr)
+                    return 1
+
+            report = await run_batch(db, owner_id=owner_id, note_ids=note_ids, tag=tag, progress=print_progress)
+    finally:
+        await close_checker()
+
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if report["revisions_failed"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grammar check the latest revisions of many notes")
+    parser.add_argument("--owner-email", help="only notes of this user")
+    parser.add_argument("--tag", help="only notes with this tag")
+    parser.add_argument("--note-id", action="append", type=UUID, default=[], help="only these notes")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.owner_email, args.tag, args.note_id)))
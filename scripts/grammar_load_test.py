@@ -0,0 +1,55 @@
+"""
+Load test for the grammar backend through the app's shared checker.
+
+Start the stub (or point LANGUAGETOOL_URL at your own LanguageTool) and run:
+    python -m scripts.grammar_load_test --requests 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.grammar_checker import init_checker, close_checker
+
+SAMPLE_TEXT = (
+    "This is an erorr in the the first paragraph. "
+    "We will recieve the results untill tomorrow.\n\n"
+)
+
+
+async def run(total: int, concurrency: int, paragraphs: int) -> None:
+    checker = await init_checker()
+    text = SAMPLE_TEXT * paragraphs
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_check():
+        async with semaphore:
+            start = time.perf_counter()
+            await checker.check(text, settings.GRAMMAR_LANGUAGE)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one_check() for _ in range(total)))
+    finally:
+        await close_checker()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"backend:     {settings.LANGUAGETOOL_URL}")
+    print(f"requests:    {total} (concurrency {concurrency}, {len(text)} chars each)")
+    print(f"throughput:  {total / elapsed:.1f} req/s")
+    print(f"p50 latency: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"p95 latency: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the grammar backend")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--paragraphs", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests, args.concurrency, args.paragraphs))
@@ -0,0 +1,106 @@
+"""
+Local LanguageTool stand-in for offline development and load testing.
+
+Implements the subset of POST /v2/check that GrammarService uses and flags
+a few deterministic mistakes (common misspellings and repeated words).
+
+Run:
+    python scripts/languagetool_stub.py --port 8010 --latency-ms 50
+
+Then point the API at it:
+    LANGUAGETOOL_URL=http://localhost:8010/v2/check
+"""
+import argparse
+import asyncio
+import re
+
+import uvicorn
+from fastapi import FastAPI, Form
+
+app = FastAPI(title="LanguageTool stub")
+
+# Artificial per-request latency, so load tests can model a real backend
+LATENCY_SECONDS = 0.0
+
+MISSPELLINGS = {
+    "erorr": "error",
+    "teh": "the",
+    "recieve": "receive",
+    "seperate": "separate",
+    "definately": "definitely",
+    "occured": "occurred",
+    "untill": "until",
+    "wich": "which",
+}
+
+WORD_PATTERN = re.compile(r"\b\w+\b")
+REPEATED_WORD_PATTERN = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+
+
+def _context(text: str, offset: int, length: int) -> dict:
+    start = max(0, offset - 20)
+    end = min(len(text), offset + length + 20)
+    return {"text": text[start:end], "offset": offset - start, "length": length}
+
+
+def _match(text: str, offset: int, length: int, message: str, replacement: str,
+           rule_id: str, issue_type: str, category: str) -> dict:
+    return {
+        "message": message,
+        "shortMessage": "",
+        "offset": offset,
+        "length": length,
+        "replacements": [{"value": replacement}],
+        "context": _context(text, offset, length),
+        "rule": {
+            "id": rule_id,
+            "issueType": issue_type,
+            "category": {"id": category.upper(), "name": category},
+        },
+    }
+
+
+def find_matches(text: str) -> list:
+    matches = []
+
+    for word in WORD_PATTERN.finditer(text):
+        fix = MISSPELLINGS.get(word.group(0).lower())
+        if fix:
+            matches.append(_match(
+                text, word.start(), len(word.group(0)),
+                "Possible spelling mistake found.", fix,
+                "MORFOLOGIK_RULE_EN_US", "misspelling", "Possible Typo"
+            ))
+
+    for repeated in REPEATED_WORD_PATTERN.finditer(text):
+        matches.append(_match(
+            text, repeated.start(), len(repeated.group(0)),
+            "Possible typo: you repeated a word.", repeated.group(1),
+            "ENGLISH_WORD_REPEAT_RULE", "duplication", "Miscellaneous"
+        ))
+
+    matches.sort(key=lambda m: m["offset"])
+    return matches
+
+
+@app.post("/v2/check")
+async def check(text: str = Form(...), language: str = Form("en-US")):
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+
+    return {
+        "software": {"name": "LanguageTool stub", "apiVersion": 1},
+        "language": {"name": language, "code": language},
+        "matches": find_matches(text),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local LanguageTool stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    LATENCY_SECONDS = args.latency_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, create_engine, select
+
+from app.core.query_budget import QueryBudgetExceeded, fingerprint, install_query_log
+
+metadata = MetaData()
+notes = Table(
+    "notes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String),
+)
+tags = Table(
+    "tags", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("note_id", Integer, ForeignKey("notes.id")),
+    Column("name", String),
+)
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    install_query_log(engine)
+    metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(notes.insert(), [{"id": i, "title": f"Note {i}"} for i in range(1, 11)])
+        conn.execute(tags.insert(), [{"note_id": i, "name": "docs"} for i in range(1, 11)])
+        yield conn
+    engine.dispose()
+
+
+def tags_one_by_one(conn):
+    rows = conn.execute(select(notes.c.id)).all()
+    return {row.id: conn.execute(select(tags.c.name).where(tags.c.note_id == row.id)).scalars().all() for row in rows}
+
+
+def tags_in_one_query(conn):
+    result = {row.id: [] for row in conn.execute(select(notes.c.id))}
+    for note_id, name in conn.execute(select(tags.c.note_id, tags.c.name).where(tags.c.note_id.in_(list(result)))):
+        result[note_id].append(name)
+    return result
+
+
+def test_n_plus_one_breaks_the_budget(sql_budget, conn):
+    with pytest.raises(QueryBudgetExceeded, match=r"10x SELECT tags.name FROM tags WHERE tags.note_id = \?"):
+        with sql_budget(max_queries=3, max_repeats=1):
+            tags_one_by_one(conn)
+
+
+def test_batched_load_stays_within_budget(sql_budget, conn):
+    with sql_budget(max_queries=3, max_repeats=1) as log:
+        loaded = tags_in_one_query(conn)
+
+    assert loaded == tags_one_by_one(conn)
+    assert log.count == 2
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM notes WHERE id IN (1, 2, 3) AND title = 'a'") == \
+        fingerprint("SELECT * FROM notes WHERE id IN (7)  AND title = 'b'")